@@ -1,19 +1,291 @@
 """Execution client interfaces for order routing and execution."""
 
+import math
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional
+from datetime import datetime, tzinfo
+from collections.abc import Mapping
+from pathlib import Path
+from typing import List, Iterator, Optional
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from loguru import logger
-from src.types import Order, MultiBar, Trade, Position, OrderSide, OrderType
+from src.broker_kernels import (
+    TYPE_LIMIT,
+    TYPE_MARKET,
+    TYPE_STOP,
+    apply_fill,
+    limit_fill_price,
+    resolve_fill_prices,
+    stop_fill_price,
+)
+from src.types import (
+    Order,
+    MultiBar,
+    Trade,
+    Position,
+    OrderSide,
+    OrderType,
+    SymbolTable,
+)
+
+_SIDE_NAMES = {side.value: side.name for side in OrderSide}
+_TYPE_CODES = {
+    OrderType.MARKET: TYPE_MARKET,
+    OrderType.LIMIT: TYPE_LIMIT,
+    OrderType.STOP: TYPE_STOP,
+}
+
+_DEBUG_NO = logger.level("DEBUG").no
+
+#: Books with fewer pending orders are filled one order at a time; the
+#: vectorized pass only pays off once its fixed per-bar cost is amortized
+VECTORIZE_MIN_ORDERS = 16
+
+# Pure-Python bodies of the fill kernels, for the scalar path (no dispatch)
+_limit_fill_price = limit_fill_price.py_func
+_stop_fill_price = stop_fill_price.py_func
+
+
+def _debug_enabled() -> bool:
+    """Whether any loguru handler accepts DEBUG records.
+
+    Checked once per call site so disabled debug logging does not pay for
+    argument evaluation (enum ``.value`` lookups, tuple packing) per order.
+    """
+    return logger._core.min_level <= _DEBUG_NO
+
+
+TRADE_DTYPE = np.dtype(
+    [
+        ("ts", "i8"),
+        ("sym_id", "i4"),
+        ("side", "i1"),
+        ("qty", "f8"),
+        ("price", "f8"),
+        ("slip", "f8"),
+        ("comm", "f8"),
+        ("pnl", "f8"),
+    ]
+)
+
+
+class TradeLog:
+    """Append-only trade store backed by a growable NumPy structured array.
+
+    Rows use ``TRADE_DTYPE`` (timestamps as int64 nanoseconds, symbols as
+    ids in the shared ``SymbolTable``) so aggregate statistics can run as
+    vectorized passes over ``to_array()``. Indexing and iteration still
+    yield ``Trade`` objects.
+    """
+
+    def __init__(self, symbols: SymbolTable, capacity: int = 1024):
+        self._rows = np.empty(capacity, dtype=TRADE_DTYPE)
+        self._n = 0
+        self.symbols = symbols
+        self._tz: Optional[tzinfo] = None
+
+    def append(
+        self,
+        timestamp: datetime,
+        sym_id: int,
+        side: int,
+        quantity: float,
+        price: float,
+        slippage: float,
+        commission: float,
+        pnl: float,
+    ) -> None:
+        if self._n == len(self._rows):
+            self._rows = np.resize(self._rows, 2 * len(self._rows))
+        if self._n == 0:
+            self._tz = timestamp.tzinfo
+        self._rows[self._n] = (
+            pd.Timestamp(timestamp).value,
+            sym_id,
+            side,
+            quantity,
+            price,
+            slippage,
+            commission,
+            pnl,
+        )
+        self._n += 1
+
+    def to_array(self) -> np.ndarray:
+        """Return a view of the recorded rows."""
+        return self._rows[: self._n]
+
+    def to_parquet(self, path: Path) -> None:
+        """Write the trades to a zstd-compressed Parquet file.
+
+        Columns are handed to pyarrow straight from the structured array;
+        symbols and sides are written dictionary-encoded, so no per-trade
+        Python objects are built.
+
+        Args:
+            path: Destination file
+        """
+        rows = self.to_array()
+        sides = [side.name for side in OrderSide]
+        table = pa.table(
+            {
+                # pyarrow derives the zone name from the tzinfo itself;
+                # str() would give names like "UTC+05:00" for fixed offsets
+                # that readers reject
+                "timestamp": pa.array(
+                    np.ascontiguousarray(rows["ts"]), pa.timestamp("ns", tz=self._tz)
+                ),
+                "symbol": pa.DictionaryArray.from_arrays(
+                    np.ascontiguousarray(rows["sym_id"]), list(self.symbols)
+                ),
+                "side": pa.DictionaryArray.from_arrays(
+                    (rows["side"] != OrderSide.BUY).astype(np.int8), sides
+                ),
+                "quantity": np.ascontiguousarray(rows["qty"]),
+                "price": np.ascontiguousarray(rows["price"]),
+                "slippage": np.ascontiguousarray(rows["slip"]),
+                "commission": np.ascontiguousarray(rows["comm"]),
+                "pnl": np.ascontiguousarray(rows["pnl"]),
+            }
+        )
+        pq.write_table(table, path, compression="zstd")
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __getitem__(self, i: int) -> Trade:
+        if i < 0:
+            i += self._n
+        if not 0 <= i < self._n:
+            raise IndexError("trade index out of range")
+        ts, sym_id, side, qty, price, slip, comm, pnl = self._rows[i].tolist()
+        timestamp = pd.Timestamp(ts, tz="UTC")
+        timestamp = (
+            timestamp.tz_convert(self._tz) if self._tz else timestamp.tz_localize(None)
+        )
+        return Trade(
+            timestamp=timestamp.to_pydatetime(),
+            symbol=self.symbols.symbol(sym_id),
+            side=_SIDE_NAMES[side],
+            quantity=qty,
+            price=price,
+            slippage=slip,
+            commission=comm,
+            pnl=pnl,
+        )
+
+    def __iter__(self) -> Iterator[Trade]:
+        for i in range(self._n):
+            yield self[i]
+
+
+ORDER_DTYPE = np.dtype(
+    [
+        ("sym_id", "i4"),
+        ("side", "i1"),
+        ("type", "i1"),
+        ("qty", "f8"),
+        ("limit", "f8"),
+        ("stop", "f8"),
+    ]
+)
+
+
+class OrderBook:
+    """Pending orders kept as ``Order`` objects plus parallel NumPy columns.
+
+    The ``ORDER_DTYPE`` columns are maintained as orders are added and
+    removed so a whole bar can be evaluated with array operations instead of
+    a per-order Python loop. Iteration and indexing yield ``Order`` objects.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self._orders: List[Order] = []
+        self._rows = np.empty(capacity, dtype=ORDER_DTYPE)
+
+    def add(self, order: Order) -> None:
+        n = len(self._orders)
+        if n == len(self._rows):
+            self._rows = np.resize(self._rows, 2 * len(self._rows))
+        self._rows[n] = (
+            order.sym_id,
+            order.side.value,
+            _TYPE_CODES[order.order_type],
+            abs(order.quantity),
+            math.nan if order.limit_price is None else order.limit_price,
+            math.nan if order.stop_price is None else order.stop_price,
+        )
+        self._orders.append(order)
+
+    def columns(self) -> np.ndarray:
+        """Return a view of the pending orders' columns."""
+        return self._rows[: len(self._orders)]
+
+    def keep(self, mask: np.ndarray) -> None:
+        """Drop every order whose ``mask`` entry is False, preserving order."""
+        n = len(self._orders)
+        kept = self._rows[:n][mask]
+        self._rows[: len(kept)] = kept
+        self._orders = [order for order, k in zip(self._orders, mask.tolist()) if k]
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    def __getitem__(self, i: int) -> Order:
+        return self._orders[i]
+
+    def __iter__(self) -> Iterator[Order]:
+        return iter(self._orders)
+
+
+class PositionBook(Mapping[str, Position]):
+    """Positions stored in a flat list indexed by interned symbol id.
+
+    Fill loops index ``slots[sym_id]`` directly; the ``Mapping`` interface
+    keeps symbol lookups (``positions["AAPL"]``) working for callers.
+    """
+
+    __slots__ = ("_symbols", "slots")
+
+    def __init__(self, symbols: SymbolTable):
+        self._symbols = symbols
+        self.slots: List[Position] = []
+
+    def add(self, symbol: str) -> int:
+        """Return the symbol's id, creating its Position slot on first use."""
+        sym_id = self._symbols.get_or_add(symbol)
+        if sym_id == len(self.slots):
+            self.slots.append(Position(symbol=symbol))
+        return sym_id
+
+    def __getitem__(self, symbol: str) -> Position:
+        sym_id = self._symbols.get(symbol)
+        if sym_id is None or sym_id >= len(self.slots):
+            raise KeyError(symbol)
+        return self.slots[sym_id]
+
+    def __iter__(self) -> Iterator[str]:
+        return (position.symbol for position in self.slots)
+
+    def __len__(self) -> int:
+        return len(self.slots)
 
 
 class Broker(ABC):
     """Abstract interface for execution clients (backtest simulation and live brokers)."""
 
     def __init__(self):
-        self.orders: List[Order] = []
-        self.trades: List[Trade] = []
-        self.closed_trades: List[Trade] = []
-        self.positions: Dict[str, Position] = {}  # symbol -> Position
+        self.orders = OrderBook()
+        self.symbols = SymbolTable()
+        self.trades = TradeLog(self.symbols)
+        self.closed_trades = TradeLog(self.symbols)
+        self.positions = PositionBook(self.symbols)
+
+    def _intern(self, symbol: str) -> int:
+        """Return the symbol's id, creating its Position slot on first use."""
+        return self.positions.add(symbol)
 
     def next(self, current_bar: MultiBar) -> None:
         self.process_orders(current_bar)
@@ -46,6 +318,10 @@ class BacktestSimulationBroker(Broker):
         self.cash = initial_cash
         self.slippage = slippage
         self.commission = commission
+        # symbol id -> bar row map, reused while the driver keeps passing the
+        # same symbol index (the data client's stream does for every bar)
+        self._row_index: Optional[Mapping[str, int]] = None
+        self._rows_by_id = np.empty(0, dtype=np.intp)
 
         # Additional initialization for backtest simulation
         self.equity_curve: List[float] = []
@@ -68,147 +344,255 @@ class BacktestSimulationBroker(Broker):
         else:
             order_type = OrderType.MARKET
 
-        order = Order(symbol, side, quantity, order_type, limit, stop)
-        self.orders.append(order)
-        logger.debug(
-            "Order accepted: {} {} {} type={} limit={} stop={}",
-            order.symbol,
-            order.side.value,
-            order.quantity,
-            order.order_type.value,
-            order.limit_price,
-            order.stop_price,
+        order = Order(
+            symbol, side, quantity, order_type, limit, stop, self._intern(symbol)
         )
+        self.orders.add(order)
+        if _debug_enabled():
+            logger.debug(
+                "Order accepted: {} {} {} type={} limit={} stop={}",
+                order.symbol,
+                order.side.name,
+                order.quantity,
+                order.order_type.value,
+                order.limit_price,
+                order.stop_price,
+            )
 
         return order
 
+    def _rows_for(self, symbol_index: Mapping[str, int]) -> np.ndarray:
+        """Return each interned symbol's row in bars laid out by ``symbol_index``."""
+        if symbol_index is not self._row_index or len(self._rows_by_id) != len(
+            self.symbols
+        ):
+            self._row_index = symbol_index
+            self._rows_by_id = np.array(
+                [symbol_index.get(symbol, -1) for symbol in self.symbols],
+                dtype=np.intp,
+            )
+        return self._rows_by_id
+
     def process_orders(self, current_bar: MultiBar) -> None:
-        for order in list(self.orders):
-            bar = current_bar.get(order.symbol)
-            if bar is None:
-                logger.debug(
-                    "Skipping order (no bar): {} {} {}",
-                    order.symbol,
-                    order.side.value,
-                    order.quantity,
-                )
-                continue
+        """Fill pending orders against one bar.
 
-            open_price = bar.open if bar.open is not None else bar.close
-            if open_price is None:
-                logger.debug(
-                    "Skipping order (no open/close): {} {} {}",
-                    order.symbol,
-                    order.side.value,
-                    order.quantity,
-                )
-                continue
-            high = bar.high if bar.high is not None else open_price
-            low = bar.low if bar.low is not None else open_price
+        Books with fewer than ``VECTORIZE_MIN_ORDERS`` orders are filled one
+        order at a time; larger ones in a single vectorized pass over the
+        bar's price columns.
 
-            fill_price = None
-            if order.order_type == OrderType.MARKET:
-                fill_price = open_price
-            elif order.order_type == OrderType.LIMIT and order.limit_price is not None:
-                if order.side == OrderSide.BUY and low <= order.limit_price:
-                    fill_price = min(open_price, order.limit_price)
-                elif order.side == OrderSide.SELL and high >= order.limit_price:
-                    fill_price = max(open_price, order.limit_price)
-            elif order.order_type == OrderType.STOP and order.stop_price is not None:
-                if order.side == OrderSide.BUY and high >= order.stop_price:
-                    fill_price = max(open_price, order.stop_price)
-                elif order.side == OrderSide.SELL and low <= order.stop_price:
-                    fill_price = min(open_price, order.stop_price)
-
-            if fill_price is None:
-                logger.debug(
-                    "Order not filled this bar: {} {} {} type={}",
-                    order.symbol,
-                    order.side.value,
-                    order.quantity,
-                    order.order_type.value,
-                )
-                continue
+        Args:
+            current_bar: Bar for every symbol (missing prices are NaN)
+        """
+        book = self.orders
+        if not len(book):
+            return
+        if len(book) < VECTORIZE_MIN_ORDERS:
+            self._process_orders_scalar(current_bar)
+            return
+        debug = _debug_enabled()
+        close = current_bar.close
+
+        # Resolve missing prices for every symbol at once with NaN masks:
+        # open falls back to close, high/low fall back to the resolved open.
+        opens = np.where(np.isnan(current_bar.open), close, current_bar.open)
+        highs = np.where(np.isnan(current_bar.high), opens, current_bar.high)
+        lows = np.where(np.isnan(current_bar.low), opens, current_bar.low)
+
+        # Map every order to its row in this bar (-1 when the bar has no data
+        # for the symbol), then gather that row's prices for all orders at once
+        rows_by_id = self._rows_for(current_bar.symbol_index)
+        cols = book.columns()
+        bar_rows = rows_by_id[cols["sym_id"]]
+        has_bar = bar_rows >= 0
+        safe_rows = np.where(has_bar, bar_rows, 0)
+        order_opens = np.where(has_bar, opens[safe_rows], np.nan)
 
-            quantity = abs(order.quantity)
-            position = self.positions.get(order.symbol)
-            if position is None:
-                position = Position(symbol=order.symbol)
-                self.positions[order.symbol] = position
-
-            if self.slippage:
-                fill_price = (
-                    fill_price + self.slippage
-                    if order.side == OrderSide.BUY
-                    else fill_price - self.slippage
-                )
-
-            trade_pnl = 0.0
-            if order.side == OrderSide.BUY:
-                if position.quantity < 0:
-                    close_quantity = min(abs(position.quantity), quantity)
-                    trade_pnl = (position.avg_price - fill_price) * close_quantity
-                    position.quantity += close_quantity
-                    if position.quantity == 0:
-                        position.avg_price = 0.0
-                    if quantity > close_quantity:
-                        remaining = quantity - close_quantity
-                        position.avg_price = fill_price
-                        position.quantity = remaining
+        # Orders without a usable price resolve to NaN and stay in the book
+        fill_prices = resolve_fill_prices(
+            cols["type"],
+            cols["side"],
+            cols["limit"],
+            cols["stop"],
+            order_opens,
+            highs[safe_rows],
+            lows[safe_rows],
+            self.slippage,
+        )
+        unfilled = np.isnan(fill_prices)
+
+        if debug:
+            for i in np.flatnonzero(unfilled).tolist():
+                order = book[i]
+                if not has_bar[i]:
+                    reason = "Skipping order (no bar): {} {} {}"
+                elif math.isnan(order_opens[i]):
+                    reason = "Skipping order (no open/close): {} {} {}"
                 else:
-                    total_cost = (
-                        position.avg_price * position.quantity + fill_price * quantity
+                    logger.debug(
+                        "Order not filled this bar: {} {} {} type={}",
+                        order.symbol,
+                        order.side.name,
+                        order.quantity,
+                        order.order_type.value,
                     )
-                    position.quantity += quantity
-                    position.avg_price = (
-                        total_cost / position.quantity if position.quantity else 0.0
+                    continue
+                logger.debug(reason, order.symbol, order.side.name, order.quantity)
+
+        if unfilled.all():
+            return
+
+        # Fills on the same symbol depend on each other, so apply them in
+        # submission order
+        sides = cols["side"].tolist()
+        quantities = cols["qty"].tolist()
+        sym_ids = cols["sym_id"].tolist()
+        fill_list = fill_prices.tolist()
+        for i in np.flatnonzero(~unfilled).tolist():
+            self._book_fill(
+                book[i],
+                sym_ids[i],
+                sides[i],
+                quantities[i],
+                fill_list[i],
+                current_bar.timestamps[bar_rows[i]],
+            )
+
+        # Compact the order book in one pass instead of list.remove per fill
+        book.keep(unfilled)
+
+    def _process_orders_scalar(self, current_bar: MultiBar) -> None:
+        """Fill a small order book one order at a time.
+
+        Same rules as the vectorized path in ``process_orders``, evaluated with
+        the fill kernels' pure-Python bodies: for a handful of orders this
+        avoids the fixed cost of the array temporaries and kernel dispatch.
+        """
+        book = self.orders
+        debug = _debug_enabled()
+        slippage = self.slippage
+        symbol_index = current_bar.symbol_index
+        open, high, low, close = (
+            current_bar.open,
+            current_bar.high,
+            current_bar.low,
+            current_bar.close,
+        )
+        keep = []
+        for order in book:
+            row = symbol_index.get(order.symbol)
+            if row is None:
+                if debug:
+                    logger.debug(
+                        "Skipping order (no bar): {} {} {}",
+                        order.symbol,
+                        order.side.name,
+                        order.quantity,
+                    )
+                keep.append(True)
+                continue
+            open_price = open.item(row)
+            if math.isnan(open_price):
+                open_price = close.item(row)
+            if math.isnan(open_price):
+                if debug:
+                    logger.debug(
+                        "Skipping order (no open/close): {} {} {}",
+                        order.symbol,
+                        order.side.name,
+                        order.quantity,
+                    )
+                keep.append(True)
+                continue
+
+            side = order.side.value
+            order_type = order.order_type
+            if order_type is OrderType.MARKET:
+                fill_price = open_price
+            else:
+                high_price = high.item(row)
+                if math.isnan(high_price):
+                    high_price = open_price
+                low_price = low.item(row)
+                if math.isnan(low_price):
+                    low_price = open_price
+                if order_type is OrderType.LIMIT:
+                    fill_price = _limit_fill_price(
+                        side, order.limit_price, open_price, high_price, low_price
                     )
-            else:  # SELL
-                if position.quantity > 0:
-                    close_quantity = min(position.quantity, quantity)
-                    trade_pnl = (fill_price - position.avg_price) * close_quantity
-                    position.quantity -= close_quantity
-                    if position.quantity == 0:
-                        position.avg_price = 0.0
-                    if quantity > close_quantity:
-                        remaining = quantity - close_quantity
-                        position.avg_price = fill_price
-                        position.quantity = -remaining
                 else:
-                    total_proceeds = (
-                        abs(position.avg_price * position.quantity)
-                        + fill_price * quantity
+                    fill_price = _stop_fill_price(
+                        side, order.stop_price, open_price, high_price, low_price
                     )
-                    position.quantity -= quantity
-                    position.avg_price = (
-                        abs(total_proceeds / position.quantity)
-                        if position.quantity < 0
-                        else 0.0
+            if math.isnan(fill_price):
+                if debug:
+                    logger.debug(
+                        "Order not filled this bar: {} {} {} type={}",
+                        order.symbol,
+                        order.side.name,
+                        order.quantity,
+                        order.order_type.value,
                     )
+                keep.append(True)
+                continue
 
-            slippage_cost = abs(quantity * self.slippage)
-            commission_cost = self.commission
-            trade_pnl -= commission_cost
-
-            trade = Trade(
-                timestamp=bar.timestamp,
-                symbol=order.symbol,
-                side=order.side.value,
-                quantity=quantity,
-                price=fill_price,
-                slippage=slippage_cost,
-                commission=commission_cost,
-                pnl=trade_pnl,
+            self._book_fill(
+                order,
+                order.sym_id,
+                side,
+                abs(order.quantity),
+                fill_price + side * slippage,
+                current_bar.timestamps[row],
             )
-            self.trades.append(trade)
-            if trade_pnl != 0.0:
-                self.closed_trades.append(trade)
-            self.orders.remove(order)
-            logger.info(
-                "Order filled: {} {} {} @ {} pnl={}",
-                order.symbol,
-                order.side.value,
+            keep.append(False)
+
+        if not all(keep):
+            book.keep(np.array(keep))
+
+    def _book_fill(
+        self,
+        order: Order,
+        sym_id: int,
+        side: int,
+        quantity: float,
+        fill_price: float,
+        timestamp: datetime,
+    ) -> None:
+        """Apply one fill to the order's position and record the trade."""
+        position = self.positions.slots[sym_id]
+        position.quantity, position.avg_price, trade_pnl = apply_fill(
+            position.quantity, position.avg_price, side, quantity, fill_price
+        )
+
+        slippage_cost = abs(quantity * self.slippage)
+        commission_cost = self.commission
+        trade_pnl -= commission_cost
+
+        self.trades.append(
+            timestamp,
+            sym_id,
+            side,
+            quantity,
+            fill_price,
+            slippage_cost,
+            commission_cost,
+            trade_pnl,
+        )
+        if trade_pnl != 0.0:
+            self.closed_trades.append(
+                timestamp,
+                sym_id,
+                side,
                 quantity,
                 fill_price,
+                slippage_cost,
+                commission_cost,
                 trade_pnl,
             )
+        logger.info(
+            "Order filled: {} {} {} @ {} pnl={}",
+            order.symbol,
+            order.side.name,
+            quantity,
+            fill_price,
+            trade_pnl,
+        )
@@ -0,0 +1,112 @@
+"""Numba-compiled kernels for the simulated broker's fill logic.
+
+Order sides and types are encoded as small integers so the kernels can run
+without touching Python enums or objects.
+"""
+
+import math
+
+import numpy as np
+from numba import njit
+
+SIDE_BUY = 1
+SIDE_SELL = -1
+
+TYPE_MARKET = 0
+TYPE_LIMIT = 1
+TYPE_STOP = 2
+
+
+@njit(cache=True)
+def limit_fill_price(
+    side: int, limit: float, open_price: float, high: float, low: float
+) -> float:
+    """Return the fill price of a limit order against one bar, or NaN."""
+    if side == SIDE_BUY and low <= limit:
+        return min(open_price, limit)
+    if side == SIDE_SELL and high >= limit:
+        return max(open_price, limit)
+    return math.nan
+
+
+@njit(cache=True)
+def stop_fill_price(
+    side: int, stop: float, open_price: float, high: float, low: float
+) -> float:
+    """Return the fill price of a stop order against one bar, or NaN."""
+    if side == SIDE_BUY and high >= stop:
+        return max(open_price, stop)
+    if side == SIDE_SELL and low <= stop:
+        return min(open_price, stop)
+    return math.nan
+
+
+@njit(cache=True)
+def resolve_fill_prices(
+    order_types: np.ndarray,
+    sides: np.ndarray,
+    limits: np.ndarray,
+    stops: np.ndarray,
+    opens: np.ndarray,
+    highs: np.ndarray,
+    lows: np.ndarray,
+    slippage: float,
+) -> np.ndarray:
+    """Resolve fill prices for a batch of orders, applying slippage to fills.
+
+    Orders are partitioned by type first so each loop below runs a single
+    fill rule with no per-order type dispatch.
+
+    Returns:
+        Array of fill prices, NaN where the order does not fill this bar
+    """
+    out = np.full(order_types.shape[0], np.nan)
+    for i in np.flatnonzero(order_types == TYPE_MARKET):
+        out[i] = opens[i]
+    for i in np.flatnonzero(order_types == TYPE_LIMIT):
+        out[i] = limit_fill_price(sides[i], limits[i], opens[i], highs[i], lows[i])
+    for i in np.flatnonzero(order_types == TYPE_STOP):
+        out[i] = stop_fill_price(sides[i], stops[i], opens[i], highs[i], lows[i])
+    # NaN (unfilled) entries stay NaN
+    return out + sides * slippage
+
+
+@njit(cache=True)
+def apply_fill(
+    pos_qty: float, pos_avg: float, side: int, qty: float, fill_price: float
+) -> tuple[float, float, float]:
+    """Apply a fill of ``qty`` (unsigned) to a position.
+
+    Returns:
+        Tuple of (new_quantity, new_avg_price, realized_pnl)
+    """
+    pnl = 0.0
+    if side == SIDE_BUY:
+        if pos_qty < 0:
+            close_qty = min(-pos_qty, qty)
+            pnl = (pos_avg - fill_price) * close_qty
+            pos_qty += close_qty
+            if pos_qty == 0:
+                pos_avg = 0.0
+            if qty > close_qty:
+                pos_avg = fill_price
+                pos_qty = qty - close_qty
+        else:
+            total_cost = pos_avg * pos_qty + fill_price * qty
+            pos_qty += qty
+            pos_avg = total_cost / pos_qty if pos_qty else 0.0
+    else:
+        if pos_qty > 0:
+            close_qty = min(pos_qty, qty)
+            pnl = (fill_price - pos_avg) * close_qty
+            pos_qty -= close_qty
+            if pos_qty == 0:
+                pos_avg = 0.0
+            if qty > close_qty:
+                pos_avg = fill_price
+                pos_qty = -(qty - close_qty)
+        else:
+            total_proceeds = abs(pos_avg * pos_qty) + fill_price * qty
+            pos_qty -= qty
+            pos_avg = abs(total_proceeds / pos_qty) if pos_qty < 0 else 0.0
+    return pos_qty, pos_avg, pnl
@@ -1,23 +1,32 @@
 """Data client interfaces for historical and live market data."""
 
+import hashlib
 from abc import ABC, abstractmethod
-from typing import List, Iterator, Optional, Dict
-from datetime import datetime
+from pathlib import Path
+from typing import List, Iterator, Optional, Dict, Tuple
+from datetime import date, datetime
+import numpy as np
 import yfinance as yf
 import pandas as pd
-from src.types import Bar, MultiBar
+from src.types import MultiBar, SymbolTable
 from loguru import logger
 
+CACHE_DIR = Path.home() / ".cache" / "liveback"
+OHLC_FIELDS = ("Open", "High", "Low", "Close")
+
 
 class DataClient(ABC):
     """Abstract interface for data clients (backtest and live modes)."""
 
+    #: Number of bars ``stream`` yields, or None while it is not known
+    n_bars: Optional[int] = None
+
     @abstractmethod
-    def stream(self) -> Iterator[Dict[str, Bar]]:
+    def stream(self) -> Iterator[MultiBar]:
         """Stream historical events in chronological order (backtest mode).
 
         Yields:
-            Dict[str, Bar]: Symbol to bar data in time order
+            MultiBar: Bars for every symbol, one step at a time
         """
         pass
 
@@ -32,6 +41,8 @@ class YFinanceDataClient(DataClient):
         end_date: Optional[datetime] = None,
         period: Optional[str] = None,
         interval: str = "1d",
+        cache_dir: Optional[Path] = CACHE_DIR,
+        price_dtype: np.dtype = np.float32,
     ):
         """Initialize YFinance data client.
 
@@ -43,6 +54,17 @@ class YFinanceDataClient(DataClient):
                     If provided, start_date and end_date are ignored
             interval: Data interval ("1m", "2m", "5m", "15m", "30m", "60m", "90m",
                      "1h", "1d", "5d", "1wk", "1mo", "3mo"). Defaults to "1d"
+            cache_dir: Directory where downloads are kept as zstd-compressed
+                       Parquet and reused on later runs instead of hitting the
+                       network again. Defaults to ~/.cache/liveback; None
+                       disables caching
+            price_dtype: dtype of the Open/High/Low/Close array. float32
+                         halves memory traffic while streaming; it carries
+                         ~7 significant digits, so prices come back rounded
+                         (e.g. 100.1 -> 100.09999847). Pass np.float64 when
+                         exact decimal prices matter. Volume is kept in its
+                         own float64 array either way, since share counts
+                         exceed float32's exact integer range (2**24)
 
         Note:
             Either (start_date, end_date) or period must be provided.
@@ -55,6 +77,10 @@ class YFinanceDataClient(DataClient):
         self.end_date = end_date or datetime.now()
         self.period = period
         self.interval = interval
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.price_dtype = np.dtype(price_dtype)
+        # Open-ended requests (rolling period or no end date) change daily
+        self._open_ended = period is not None or end_date is None
 
         self.n_bars: int = None
         self.current_bar: int = None
@@ -63,90 +89,181 @@ class YFinanceDataClient(DataClient):
         if not period and not start_date:
             raise ValueError("Either 'period' or 'start_date' must be provided")
 
-        # Store fetched data
-        self._data: Dict[pd.DataFrame] = None
+        # Fetched data: prices as one (n_bars, n_symbols, 4) array indexed by
+        # [bar, symbol, field] with fields in OHLC_FIELDS order, volumes as a
+        # float64 (n_bars, n_symbols) array, plus the shared bar timestamps
+        self.ohlc: np.ndarray = None
+        self.volume: np.ndarray = None
+        self.timestamps: np.ndarray = None
+        self._symbol_index: SymbolTable = None
 
-    def _fetch_data(self) -> Dict[pd.DataFrame]:
-        """Fetch historical data from Yahoo Finance.
+    def _cache_path(self) -> Path:
+        """Return the Parquet cache file for this request."""
+        key = hashlib.sha1(
+            repr(
+                (
+                    tuple(sorted(self.symbols)),
+                    self.start_date,
+                    date.today() if self._open_ended else self.end_date,
+                    self.period,
+                    self.interval,
+                )
+            ).encode()
+        ).hexdigest()
+        return self.cache_dir / f"{key}.parquet"
+
+    def _fetch_data(self) -> None:
+        """Fetch historical data, from the local cache when available."""
+        if self.ohlc is not None:
+            return
+
+        cache_path = self._cache_path() if self.cache_dir is not None else None
+        if cache_path is not None and cache_path.exists():
+            logger.debug("Loading cached data from {}", cache_path)
+            combined = pd.read_parquet(cache_path)
+            # Each symbol's block is already time-ordered and contiguous, so
+            # split it in one unsorted pass instead of a .loc lookup per symbol
+            all_data = {
+                symbol: frame.reset_index(drop=True)
+                for symbol, frame in combined.groupby(level="Symbol", sort=False)
+            }
+            self.n_bars = len(next(iter(all_data.values())))
+        else:
+            all_data = self._download()
+            if cache_path is not None:
+                cache_path.parent.mkdir(parents=True, exist_ok=True)
+                pd.concat(all_data, names=["Symbol", None]).to_parquet(
+                    cache_path, compression="zstd"
+                )
+
+        self._build_arrays(all_data)
+
+    def _download(self) -> Dict[str, pd.DataFrame]:
+        """Download historical data from Yahoo Finance.
+
+        All symbols are fetched with one threaded ``yf.download`` call rather
+        than a blocking request per symbol.
 
         Returns:
-            DataFrame with Datetime, Symbol, and OHLCV columns
+            Dict mapping each symbol to a DataFrame with Datetime and OHLCV columns
         """
-        if self._data is not None:
-            return self._data
+        logger.debug("Fetching data for {}", ", ".join(self.symbols))
+        raw = yf.download(
+            self.symbols,
+            group_by="ticker",
+            multi_level_index=True,
+            threads=True,
+            progress=False,
+            **self._history_kwargs(),
+        )
 
+        # Every symbol shares the downloaded index, so bars stay aligned
         all_data = {}
+        fetched = set() if raw is None else set(raw.columns.get_level_values(0))
         for symbol in self.symbols:
-            logger.debug(f"Fetching data for {symbol}")
-            try:
-                ticker = yf.Ticker(symbol)
-
-                if self.period:
-                    hist = ticker.history(period=self.period, interval=self.interval)
-                else:
-                    hist = ticker.history(
-                        start=self.start_date, end=self.end_date, interval=self.interval
-                    )
-
-                if hist.empty:
-                    continue
-
-                # Reset index to make Datetime a column
-                hist = hist.reset_index()
-
-                # Rename the datetime column to 'Datetime' for consistency
-                # yfinance uses 'Date' for daily data, but we want 'Datetime'
-                # Check common datetime column names and rename if needed
-                datetime_cols = ["Date", "Datetime"]
-                for col in datetime_cols:
-                    if col in hist.columns and col != "Datetime":
-                        hist = hist.rename(columns={col: "Datetime"})
-                        break
-                # If no named datetime column found, assume first column is datetime
-                if "Datetime" not in hist.columns:
-                    hist = hist.rename(columns={hist.columns[0]: "Datetime"})
-
-                # Add symbol column
-                all_data[symbol] = hist
-                if not self.n_bars:
-                    self.n_bars = len(hist)
-                    logger.debug(f"Fetched {self.n_bars} bars for {symbol}")
-                else:
-                    assert self.n_bars == hist.size, (
-                        "Inconsistent number of bars fetched"
-                    )
-            except Exception as e:
-                # Log warning but continue with other symbols
-                print(f"Warning: Failed to fetch data for {symbol}: {e}")
+            hist = raw[symbol] if symbol in fetched else None
+            if hist is None or hist.dropna(how="all").empty:
+                logger.warning("Failed to fetch data for {}", symbol)
                 continue
+            all_data[symbol] = self._normalize(hist)
 
         if not all_data:
             raise ValueError("No data fetched for any symbols")
 
-        self._data = all_data
-        return self._data
+        self.n_bars = len(raw)
+        logger.debug("Fetched {} bars for {} symbols", self.n_bars, len(all_data))
+        return all_data
+
+    def _history_kwargs(self) -> dict:
+        if self.period:
+            return {"period": self.period, "interval": self.interval}
+        return {
+            "start": self.start_date,
+            "end": self.end_date,
+            "interval": self.interval,
+        }
+
+    @staticmethod
+    def _normalize(hist: pd.DataFrame) -> pd.DataFrame:
+        """Turn the datetime index into a 'Datetime' column."""
+        # Reset index to make Datetime a column
+        hist = hist.reset_index()
+
+        # Rename the datetime column to 'Datetime' for consistency
+        # yfinance uses 'Date' for daily data, but we want 'Datetime'
+        # Check common datetime column names and rename if needed
+        datetime_cols = ["Date", "Datetime"]
+        for col in datetime_cols:
+            if col in hist.columns and col != "Datetime":
+                hist = hist.rename(columns={col: "Datetime"})
+                break
+        # If no named datetime column found, assume first column is datetime
+        if "Datetime" not in hist.columns:
+            hist = hist.rename(columns={hist.columns[0]: "Datetime"})
+        return hist
+
+    def _build_arrays(self, data: Dict[str, pd.DataFrame]) -> None:
+        """Pack the per-symbol frames into ``(n_bars, n_symbols, 4)`` prices.
+
+        Bar ``i`` of every symbol is contiguous, so the stream hands out
+        zero-copy views of ``ohlc[i]``. Volume goes into a separate float64
+        ``(n_bars, n_symbols)`` array so the prices can use ``price_dtype``.
+        Symbols share the downloaded index, so timestamps are converted to
+        Python datetimes once for all of them.
+        """
+        symbols = list(data)
+        self._symbol_index = SymbolTable(symbols)
+        self.timestamps = pd.DatetimeIndex(data[symbols[0]]["Datetime"]).to_pydatetime()
+        self.ohlc = np.stack(
+            [
+                data[symbol][list(OHLC_FIELDS)].to_numpy(dtype=self.price_dtype)
+                for symbol in symbols
+            ],
+            axis=1,
+        )
+        self.volume = np.stack(
+            [data[symbol]["Volume"].to_numpy(dtype=np.float64) for symbol in symbols],
+            axis=1,
+        )
+
+    def as_arrays(
+        self,
+    ) -> Tuple[
+        SymbolTable,
+        np.ndarray,
+        np.ndarray,
+        np.ndarray,
+        np.ndarray,
+        np.ndarray,
+        np.ndarray,
+    ]:
+        """Return the fetched data as ``(n_bars, n_symbols)`` arrays.
+
+        The price arrays are views of ``ohlc`` fields and the timestamps a
+        broadcast view of the shared index, so nothing is copied. ``stream``
+        walks their rows, and the compiled engine reads the timestamps here.
+
+        Returns:
+            Tuple of (symbol_index, timestamps, open, high, low, close, volume)
+        """
+        self._fetch_data()
+        ohlc = self.ohlc
+        timestamps = np.broadcast_to(self.timestamps[:, None], ohlc.shape[:2])
+        return (self._symbol_index, timestamps, *np.moveaxis(ohlc, 2, 0), self.volume)
 
     def stream(self) -> Iterator[MultiBar]:
-        data = self._fetch_data()
-        for i in range(self.n_bars):
+        """Stream the bars in chronological order.
+
+        The data is fetched when this is called rather than on the first
+        step, so ``n_bars`` is already set when the iterator is returned.
+        """
+        symbol_index, *columns = self.as_arrays()
+        return self._bars(symbol_index, columns)
+
+    def _bars(
+        self, symbol_index: SymbolTable, columns: List[np.ndarray]
+    ) -> Iterator[MultiBar]:
+        # zip walks the row views of every column in C, no per-field indexing
+        for i, (ts, o, h, lo, c, v) in enumerate(zip(*columns)):
             self.current_bar = i
-            bars = {}
-            for symbol, df in data.items():
-                row = df.iloc[i]
-                # Convert pandas Timestamp to datetime
-                timestamp = row["Datetime"]
-                if isinstance(timestamp, pd.Timestamp):
-                    timestamp = timestamp.to_pydatetime()
-
-                # Create BAR event with OHLCV data
-                event = Bar(
-                    timestamp=timestamp,
-                    symbol=symbol,
-                    open=float(row["Open"]) if pd.notna(row["Open"]) else None,
-                    high=float(row["High"]) if pd.notna(row["High"]) else None,
-                    low=float(row["Low"]) if pd.notna(row["Low"]) else None,
-                    close=float(row["Close"]) if pd.notna(row["Close"]) else None,
-                    volume=float(row["Volume"]) if pd.notna(row["Volume"]) else None,
-                )
-                bars[symbol] = event
-            yield bars
+            yield MultiBar(symbol_index, ts, o, h, lo, c, v)
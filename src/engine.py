@@ -3,17 +3,20 @@
 from abc import ABC, abstractmethod
 import sys
 from typing import List
+import numpy as np
 from src.data_client import DataClient
 from src.broker import Broker
+from src.engine_kernels import run_backtest
 from src.metrics import Metric
 from src.report_generator import ReportGenerator
 from src.strategy import Strategy
 from src.portfolio import Portfolio
 from src.types import (
+    Fill,
+    MultiBar,
     Order,
     OrderSide,
-    FillEvent,
-    PriceUpdateEvent,
+    StrategyContext,
 )
 from loguru import logger
 
@@ -50,7 +53,17 @@ class Engine(ABC):
 
 
 class BacktestEngine(Engine):
-    """Event-driven backtest engine."""
+    """Event-driven backtest engine.
+
+    Components are wired with direct method calls rather than through an
+    event bus: a single-threaded backtest has one fixed set of handlers, so
+    routing every price update and fill through publish/subscribe only adds
+    lookups and allocations.
+
+    With ``compiled=True`` the whole bar loop runs as a Numba kernel driven
+    by the strategy's ``signal_fn`` (market orders only, filled at the next
+    bar's open); strategies without one keep the Python loop.
+    """
 
     def __init__(
         self,
@@ -60,77 +73,219 @@ class BacktestEngine(Engine):
         portfolio: Portfolio,
         metrics: List[Metric] = [],
         logging_level: str = "INFO",
+        compiled: bool = False,
     ):
         super().__init__(
             data_client, broker, strategy, portfolio, metrics, logging_level
         )
+        self.compiled = compiled
+        # Resolve handlers once instead of looking them up per event
+        self._step = portfolio.step
+        self._on_fill_strategy = strategy.on_fill
 
     def run(self, show_report: bool = True, finalize_trades: bool = False) -> None:
         """Run event-driven backtesting loop.
 
+        Orders created while handling a bar are filled by the broker against
+        the next bar.
+
         Args:
             show_report: Whether to display the backtest report
             finalize_trades: If True, close all open positions at the end
         """
-        # Event-driven backtesting loop
-        for event in self.data_client.stream():
-            # Publish price update event (portfolio and risk manager will react)
-            self.event_bus.publish(
-                PriceUpdateEvent(
-                    symbol=event.symbol,
-                    price=event.close_price,
-                    timestamp=event.timestamp,
+        if self.strategy.context is None:
+            self.strategy.initialize(
+                StrategyContext(
+                    portfolio=self.portfolio,
+                    data_client=self.data_client,
+                    execution_client=self.execution_client,
                 )
             )
 
-            # Handle event in strategy
-            self.strategy.on_event(event)
+        if self.compiled and self.strategy.signal_fn is not None:
+            self._run_compiled(finalize_trades)
+            if show_report:
+                report = self.report_generator.generate(self.portfolio)
+                print(self.report_generator.format_report(report))
+            return
+        if self.compiled:
+            logger.warning(
+                "{} has no signal_fn, using the Python loop",
+                type(self.strategy).__name__,
+            )
 
-            # Get orders from strategy
-            orders = self.strategy.get_orders()
+        # Bind loop-invariant methods to locals once
+        settle = self._settle
+        submit = self._submit
+        on_event = self.strategy.on_event
+        get_orders = self.strategy.get_orders
 
-            # Process each order
-            for order in orders:
-                # Send order to execution client (use current event price)
-                current_price = (
-                    event.close_price if order.symbol == event.symbol else None
-                )
-                fill = self.execution_client.process_orders(
-                    order, current_bar=current_price
-                )
+        bars = self.data_client.stream()
+        # Size the equity curve for the whole run up front when the data
+        # client knows its length, so recording equity never regrows it
+        n_bars = self.data_client.n_bars
+        if n_bars:
+            curve = self.portfolio.equity_curve
+            curve.reserve(len(curve) + n_bars)
 
-                # Publish fill event (portfolio and strategy will react)
-                self.event_bus.publish(FillEvent(fill=fill, timestamp=fill.timestamp))
+        last_bar = None
+        for bar in bars:
+            # Fill orders from the previous step at this bar's prices and
+            # mark positions to market
+            settle(bar, bar)
 
-            # Finalize trades by closing all open positions
-        if finalize_trades:
-            self._close_all_positions()
+            # Handle event in strategy
+            for symbol_bar in bar.values():
+                on_event(symbol_bar)
+
+            # Send the strategy's new orders to the broker
+            for order in get_orders():
+                submit(order)
+            last_bar = bar
+
+        # Finalize trades by closing all open positions
+        if finalize_trades and last_bar is not None:
+            self._close_all_positions(last_bar)
 
         if show_report:
             report = self.report_generator.generate(self.portfolio)
             print(self.report_generator.format_report(report))
 
-    def _close_all_positions(self) -> None:
-        """Close all open positions by creating and executing closing orders."""
-        for symbol, position in list(self.portfolio.positions.items()):
-            if position.quantity != 0:
-                quantity = position.quantity
-                # Create closing order
-                closing_side = (
-                    OrderSide.SELL if position.quantity > 0 else OrderSide.BUY
-                )
-                closing_order = Order(
-                    symbol=symbol,
-                    side=closing_side,
-                    quantity=abs(position.quantity),
-                )
+    def _run_compiled(self, finalize_trades: bool) -> None:
+        """Run the backtest in ``run_backtest`` and load the results into the portfolio.
+
+        Args:
+            finalize_trades: If True, close all open positions at the last
+                bar's close inside the kernel
+        """
+        symbol_index, timestamps, *_ = self.data_client.as_arrays()
+        timestamps = timestamps[:, 0]
+        slippage = getattr(self.execution_client, "slippage", 0.0)
+        commission = getattr(self.execution_client, "commission", 0.0)
+        # as_arrays has loaded the data; the kernel reads the packed
+        # (n_bars, n_symbols, 4) price array as is
+        equity, positions, avg_prices, cash, trades = run_backtest(
+            self.data_client.ohlc,
+            self.portfolio.cash,
+            slippage,
+            commission,
+            self.strategy.signal_fn,
+            finalize_trades,
+        )
+
+        portfolio = self.portfolio
+        portfolio.cash = cash
+        curve = portfolio.equity_curve
+        curve.reserve(len(curve) + len(equity))
+        for timestamp, value in zip(timestamps, equity.tolist()):
+            curve.append(timestamp, value)
+        book = portfolio.positions
+        for row in trades.tolist():
+            bar, sym_id, side, quantity, price, slip, comm, pnl = row
+            portfolio.trades.append(
+                timestamps[int(bar)],
+                book.add(symbol_index.symbol(int(sym_id))),
+                int(side),
+                quantity,
+                price,
+                slip,
+                comm,
+                pnl,
+            )
+        closes = self.data_client.ohlc[:, :, 3]
+        for sym_id, (quantity, avg_price) in enumerate(
+            zip(positions.tolist(), avg_prices.tolist())
+        ):
+            if quantity != 0:
+                slot = book.add(symbol_index.symbol(sym_id))
+                book.quantity[slot] = quantity
+                book.avg_price[slot] = avg_price
+                # Mark to the last known close, as the kernel's equity does
+                known = closes[:, sym_id]
+                known = known[~np.isnan(known)]
+                if len(known):
+                    book.unrealized_pnl[slot] = (known[-1] - avg_price) * quantity
+
+    def _submit(self, order: Order) -> None:
+        """Forward a strategy order to the broker as a signed quantity."""
+        quantity = order.side * order.quantity
+        self.execution_client.new_order(
+            order.symbol, quantity, order.limit_price, order.stop_price
+        )
+
+    def _settle(self, fill_bar: MultiBar, mark_bar: MultiBar) -> None:
+        """Fill pending orders against ``fill_bar`` and update the portfolio.
 
-                # Execute closing order
-                fill = self.execution_client.process_orders(
-                    closing_order, current_bar=None
+        Fills and the mark-to-market at ``mark_bar``'s closes are applied in
+        one portfolio pass; the strategy hears about fills afterwards.
+        """
+        fills = self._fill_orders(fill_bar)
+        self._step(dict(mark_bar.closes()), fills, mark_bar.timestamp)
+        for fill in fills:
+            self._on_fill_strategy(fill)
+
+    def _fill_orders(self, bar: MultiBar) -> List[Fill]:
+        """Fill pending orders against a bar and return the new fills."""
+        broker = self.execution_client
+        trades = broker.trades
+        start = len(trades)
+        broker.process_orders(bar)
+        fills = []
+        for i in range(start, len(trades)):
+            trade = trades[i]
+            fills.append(
+                Fill(
+                    order_id=i,
+                    timestamp=trade.timestamp,
+                    symbol=trade.symbol,
+                    side=OrderSide[trade.side],
+                    quantity=trade.quantity,
+                    price=trade.price,
+                    slippage=trade.slippage,
+                    commission=trade.commission,
                 )
+            )
+        return fills
 
-                # Publish fill event (portfolio and strategy will react)
-                self.event_bus.publish(FillEvent(fill=fill, timestamp=fill.timestamp))
+    def _close_all_positions(self, last_bar: MultiBar) -> None:
+        """Close all open positions at the last bar's close prices.
 
-                logger.info(f"Closed position: {symbol} {quantity} @ {fill.price}")
+        Orders still pending in the broker (submitted on the last bar) are
+        cancelled first so they cannot reopen positions in the close-out.
+        Every closing order then goes straight into the broker's book and
+        the whole batch is filled and booked by one ``_settle`` call, so the
+        portfolio takes a single pass. The close-out happens at the last
+        bar, so its equity sample replaces that bar's instead of adding a
+        second sample at the same timestamp; with nothing to close the
+        curve is left untouched.
+        """
+        book = self.execution_client.orders
+        if len(book):
+            logger.info("Cancelling {} pending orders", len(book))
+            book.keep(np.zeros(len(book), dtype=bool))
+
+        new_order = self.execution_client.new_order
+        closing = [
+            (symbol, position.quantity)
+            for symbol, position in self.portfolio.positions.items()
+            if position.quantity != 0
+        ]
+        if not closing:
+            return
+        for symbol, quantity in closing:
+            new_order(symbol, -quantity, None, None)
+        logger.info("Closing {} positions: {}", len(closing), closing)
+
+        # Market orders fill at the open, so present the closes as the open
+        close = last_bar.close
+        closing_bar = MultiBar(
+            last_bar.symbol_index,
+            last_bar.timestamps,
+            close,
+            close,
+            close,
+            close,
+            last_bar.volume,
+        )
+        self.portfolio.equity_curve.pop()
+        self._settle(closing_bar, last_bar)
@@ -0,0 +1,189 @@
+"""Numba-compiled backtest loop for strategies written as array functions.
+
+The whole bar loop (fills, mark-to-market, equity recording and the
+strategy call) runs in native code. Strategies plug in as an ``@njit``
+function with the signature::
+
+    signal_fn(i, ohlc, positions, cash) -> np.ndarray
+
+returning the signed market-order quantity per symbol to execute at the
+next bar's open (0 for no order).
+"""
+
+import math
+
+import numpy as np
+from numba import njit
+
+from src.broker_kernels import SIDE_BUY, SIDE_SELL
+from src.portfolio_kernels import portfolio_fill
+
+OPEN, HIGH, LOW, CLOSE = range(4)
+
+
+@njit(cache=True)
+def _append_trade(
+    trades: np.ndarray,
+    n_trades: int,
+    bar: int,
+    symbol: int,
+    side: int,
+    quantity: float,
+    price: float,
+    slippage: float,
+    commission: float,
+    pnl: float,
+) -> np.ndarray:
+    """Write one trade row at ``n_trades``, growing ``trades`` when full."""
+    if n_trades == trades.shape[0]:
+        grown = np.empty((2 * n_trades, 8))
+        grown[:n_trades] = trades
+        trades = grown
+    row = trades[n_trades]
+    row[0] = bar
+    row[1] = symbol
+    row[2] = side
+    row[3] = quantity
+    row[4] = price
+    row[5] = slippage
+    row[6] = commission
+    row[7] = pnl
+    return trades
+
+
+@njit(cache=True)
+def _market_value(
+    positions: np.ndarray, avg_prices: np.ndarray, last_prices: np.ndarray
+) -> float:
+    """Value open positions at their last close (entry price before any close)."""
+    market_value = 0.0
+    for s in range(positions.shape[0]):
+        if positions[s] != 0:
+            mark = last_prices[s]
+            if math.isnan(mark):
+                mark = avg_prices[s]
+            market_value += positions[s] * mark
+    return market_value
+
+
+@njit
+def run_backtest(
+    ohlc: np.ndarray,
+    initial_cash: float,
+    slippage: float,
+    commission: float,
+    signal_fn,
+    finalize: bool = False,
+):
+    """Run a market-order backtest over an ``(n_bars, n_symbols, 4)`` OHLC array.
+
+    Orders returned by ``signal_fn`` at bar ``i`` fill at bar ``i + 1``'s
+    open (close when the open is missing) with ``BacktestSimulationBroker``'s
+    slippage and commission, and are booked as ``Portfolio.apply_fill``
+    would book them.
+
+    With ``finalize`` set, orders still pending after the last bar are
+    dropped and every open position is closed at the last bar's close;
+    the last equity sample is restated after the close-out, as
+    ``BacktestEngine.run(finalize_trades=True)`` does.
+
+    Returns:
+        Tuple of (equity per bar, final positions, final average prices,
+        final cash, trades) where
+        trades holds one ``(bar, symbol, side, quantity, price, slippage,
+        commission, pnl)`` row per fill that reduced a position, matching
+        the ``Trade`` records of ``Portfolio.trades``
+    """
+    n_bars, n_symbols, _ = ohlc.shape
+    positions = np.zeros(n_symbols)
+    avg_prices = np.zeros(n_symbols)
+    last_prices = np.full(n_symbols, np.nan)
+    pending = np.zeros(n_symbols)
+    cash = initial_cash
+    equity = np.empty(n_bars)
+    trades = np.empty((max(n_bars, 16), 8))
+    n_trades = 0
+
+    for i in range(n_bars):
+        for s in range(n_symbols):
+            quantity = pending[s]
+            if quantity == 0:
+                continue
+            open_price = ohlc[i, s, OPEN]
+            if math.isnan(open_price):
+                open_price = ohlc[i, s, CLOSE]
+            if math.isnan(open_price):
+                continue  # no price this bar, keep the order pending
+            side = SIDE_BUY if quantity > 0 else SIDE_SELL
+            fill_price = open_price + side * slippage
+            positions[s], avg_prices[s], cash, closed, pnl = portfolio_fill(
+                positions[s],
+                avg_prices[s],
+                cash,
+                side,
+                abs(quantity),
+                fill_price,
+                commission,
+            )
+            pending[s] = 0
+            if closed == 0:
+                continue
+            trades = _append_trade(
+                trades,
+                n_trades,
+                i,
+                s,
+                side,
+                closed,
+                fill_price,
+                slippage * abs(quantity),
+                commission,
+                pnl,
+            )
+            n_trades += 1
+
+        for s in range(n_symbols):
+            close = ohlc[i, s, CLOSE]
+            if not math.isnan(close):
+                last_prices[s] = close
+        equity[i] = cash + _market_value(positions, avg_prices, last_prices)
+
+        orders = signal_fn(i, ohlc, positions, cash)
+        for s in range(n_symbols):
+            if orders[s] != 0:
+                pending[s] = orders[s]
+
+    if finalize and n_bars > 0:
+        i = n_bars - 1
+        for s in range(n_symbols):
+            quantity = positions[s]
+            close = ohlc[i, s, CLOSE]
+            if quantity == 0 or math.isnan(close):
+                continue
+            side = SIDE_SELL if quantity > 0 else SIDE_BUY
+            fill_price = close + side * slippage
+            positions[s], avg_prices[s], cash, closed, pnl = portfolio_fill(
+                quantity,
+                avg_prices[s],
+                cash,
+                side,
+                abs(quantity),
+                fill_price,
+                commission,
+            )
+            trades = _append_trade(
+                trades,
+                n_trades,
+                i,
+                s,
+                side,
+                closed,
+                fill_price,
+                slippage * abs(quantity),
+                commission,
+                pnl,
+            )
+            n_trades += 1
+        equity[i] = cash + _market_value(positions, avg_prices, last_prices)
+
+    return equity, positions, avg_prices, cash, trades[:n_trades]
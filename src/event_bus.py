@@ -1,8 +1,34 @@
 """Event bus for decoupled event communication."""
 
-from typing import Callable, List, Dict, Type
+from functools import lru_cache
+from itertools import groupby
+from typing import Callable, Dict, Sequence, Tuple, Type
 from src.types import DomainEvent
 
+_NO_SUBSCRIBERS: Tuple[Callable[[DomainEvent], None], ...] = ()
+
+
+def _ignore(event: DomainEvent) -> None:
+    pass
+
+
+def _fan_out(
+    callbacks: Tuple[Callable[[DomainEvent], None], ...],
+) -> Callable[[DomainEvent], None]:
+    """Return one callable that invokes ``callbacks`` in order."""
+
+    def dispatch(event: DomainEvent) -> None:
+        for callback in callbacks:
+            callback(event)
+
+    return dispatch
+
+
+@lru_cache(maxsize=None)
+def _is_domain_type(event_type: object) -> bool:
+    """Return whether ``event_type`` is a DomainEvent subclass (memoized)."""
+    return isinstance(event_type, type) and issubclass(event_type, DomainEvent)
+
 
 class EventBus:
     """Event bus for domain events only (type-based routing).
@@ -12,8 +38,15 @@ class EventBus:
     removed in favor of explicit domain events (e.g. `PriceUpdateEvent`).
     """
 
-    # Only keep type-based domain event subscribers
-    domain_subscribers: Dict[Type, List[Callable[[DomainEvent], None]]] = {}
+    def __init__(self) -> None:
+        # Exact event type -> callbacks, stored as tuples so publish iterates
+        # an immutable snapshot with no per-call copy
+        self.domain_subscribers: Dict[
+            Type[DomainEvent], Tuple[Callable[[DomainEvent], None], ...]
+        ] = {}
+        # Exact event type -> a single handler: the lone callback itself, or a
+        # fan-out over the tuple when there are several
+        self._dispatch: Dict[Type[DomainEvent], Callable[[DomainEvent], None]] = {}
 
     def subscribe(
         self, event_type: Type[DomainEvent], callback: Callable[[DomainEvent], None]
@@ -24,23 +57,72 @@ class EventBus:
             event_type: A subclass of `DomainEvent` to subscribe to.
             callback: Function to call when the event is published.
         """
-        if not (isinstance(event_type, type) and issubclass(event_type, DomainEvent)):
+        if not _is_domain_type(event_type):
             raise TypeError("event_type must be a DomainEvent subclass")
-        if event_type not in self.domain_subscribers:
-            self.domain_subscribers[event_type] = []
-        self.domain_subscribers[event_type].append(callback)
+        callbacks = self.domain_subscribers.get(event_type, _NO_SUBSCRIBERS) + (
+            callback,
+        )
+        self.domain_subscribers[event_type] = callbacks
+        self._dispatch[event_type] = (
+            callbacks[0] if len(callbacks) == 1 else _fan_out(callbacks)
+        )
+
+    def has_subscribers(self, event_type: Type[DomainEvent]) -> bool:
+        """Return whether publishing ``event_type`` would reach any callback.
+
+        Lets publishers skip building events nobody listens to.
+        """
+        return event_type in self.domain_subscribers
 
     def publish(self, event: DomainEvent) -> None:
-        """Publish a domain event to all subscribers.
+        """Publish a domain event to the subscribers of its type.
 
         Args:
             event: Instance of a `DomainEvent` subclass.
         """
-        if not isinstance(event, DomainEvent):
-            raise TypeError("EventBus only accepts DomainEvent instances")
-        event_type = type(event)
-        for callback in self.domain_subscribers.get(event_type, []):
-            callback(event)
+        handler = self._dispatch.get(type(event))
+        if handler is None:
+            # Only DomainEvent subclasses can be subscribed, so a hit already
+            # proves the type; check non-matching events here instead
+            if not isinstance(event, DomainEvent):
+                raise TypeError("EventBus only accepts DomainEvent instances")
+            return
+        handler(event)
+
+    def dispatcher(
+        self, event_type: Type[DomainEvent]
+    ) -> Callable[[DomainEvent], None]:
+        """Return the handler ``publish`` would call for ``event_type``.
+
+        A driver publishing one event type in a hot loop can call this
+        directly and skip the per-event type lookup. The handler reflects the
+        subscriptions at the time of the call; fetch it again after
+        subscribing more callbacks.
+        """
+        return self._dispatch.get(event_type, _ignore)
+
+    def publish_many(self, events: Sequence[DomainEvent]) -> None:
+        """Publish a batch of domain events.
+
+        Subscribers see exactly the calls that publishing the events one by
+        one would make, in the same order. Consecutive events of the same
+        type share a single handler lookup, so uniform-type streams skip the
+        per-event dispatch.
+
+        Args:
+            events: Instances of `DomainEvent` subclasses.
+        """
+        dispatch = self._dispatch
+        for event_type, run in groupby(events, type):
+            handler = dispatch.get(event_type)
+            if handler is None:
+                # Unsubscribed run: only check that it holds domain events
+                if not isinstance(next(run), DomainEvent):
+                    raise TypeError("EventBus only accepts DomainEvent instances")
+                continue
+            for event in run:
+                handler(event)
 
     def clear_subscribers(self) -> None:
         self.domain_subscribers = {}
+        self._dispatch = {}
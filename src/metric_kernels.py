@@ -0,0 +1,151 @@
+"""Numba-compiled kernels for performance metrics over an equity curve."""
+
+import math
+
+import numpy as np
+from numba import njit, prange
+
+#: Curves at least this long use the multi-threaded kernels below; shorter
+#: ones are faster on a single thread than the cost of starting workers
+PARALLEL_MIN_LENGTH = 1 << 20
+
+
+@njit(cache=True)
+def return_stats(equity: np.ndarray) -> tuple[int, float, float, float]:
+    """Summarize per-bar simple returns of ``equity`` in one pass.
+
+    Returns are ``equity[i] / equity[i - 1] - 1`` and are never
+    materialized; Welford's update accumulates their mean and sum of
+    squared deviations alongside the mean log growth.
+
+    Returns:
+        Tuple of (count, mean log(1 + r), mean r, M2) where the sample
+        variance is ``M2 / (count - 1)``
+    """
+    count = 0
+    mean_log = 0.0
+    mean = 0.0
+    m2 = 0.0
+    for i in range(1, equity.shape[0]):
+        r = equity[i] / equity[i - 1] - 1.0
+        count += 1
+        mean_log += (math.log1p(r) - mean_log) / count
+        delta = r - mean
+        mean += delta / count
+        m2 += delta * (r - mean)
+    return count, mean_log, mean, m2
+
+
+@njit(cache=True)
+def max_drawdown(equity: np.ndarray) -> float:
+    """Return the deepest peak-to-trough decline of ``equity`` as a fraction (<= 0).
+
+    Tracks the running peak and worst drawdown as scalars in one scan
+    instead of materializing the running-max and drawdown arrays.
+    """
+    peak = equity[0]
+    worst = 0.0
+    for i in range(equity.shape[0]):
+        value = equity[i]
+        if value > peak:
+            peak = value
+        else:
+            drawdown = (value - peak) / peak
+            if drawdown < worst:
+                worst = drawdown
+    return worst
+
+
+@njit(cache=True, parallel=True)
+def return_stats_parallel(
+    equity: np.ndarray, chunks: int
+) -> tuple[int, float, float, float]:
+    """Multi-threaded ``return_stats`` for very long curves.
+
+    The returns are split into ``chunks`` ranges (one per thread), each
+    range runs the Welford update independently, and the partial
+    (count, mean, M2) triplets are merged with Chan's pairwise
+    combination. Results match the serial kernel up to rounding.
+    """
+    n = equity.shape[0] - 1
+    if n <= 0:
+        return 0, 0.0, 0.0, 0.0
+    chunks = max(1, min(chunks, n))
+    counts = np.zeros(chunks, dtype=np.int64)
+    mean_logs = np.zeros(chunks)
+    means = np.zeros(chunks)
+    m2s = np.zeros(chunks)
+    for c in prange(chunks):
+        c_count = 0
+        c_mean_log = 0.0
+        c_mean = 0.0
+        c_m2 = 0.0
+        for i in range(1 + c * n // chunks, 1 + (c + 1) * n // chunks):
+            r = equity[i] / equity[i - 1] - 1.0
+            c_count += 1
+            c_mean_log += (math.log1p(r) - c_mean_log) / c_count
+            delta = r - c_mean
+            c_mean += delta / c_count
+            c_m2 += delta * (r - c_mean)
+        counts[c] = c_count
+        mean_logs[c] = c_mean_log
+        means[c] = c_mean
+        m2s[c] = c_m2
+
+    count = 0
+    mean_log = 0.0
+    mean = 0.0
+    m2 = 0.0
+    for c in range(chunks):
+        other = counts[c]
+        if other == 0:
+            continue
+        total = count + other
+        shift = means[c] - mean
+        mean += shift * other / total
+        m2 += m2s[c] + shift * shift * count * other / total
+        mean_log += (mean_logs[c] - mean_log) * other / total
+        count = total
+    return count, mean_log, mean, m2
+
+
+@njit(cache=True, parallel=True)
+def max_drawdown_parallel(equity: np.ndarray, chunks: int) -> float:
+    """Multi-threaded ``max_drawdown`` for very long curves.
+
+    A running peak is a prefix maximum, so the scan takes two parallel
+    passes over ``chunks`` ranges: the first finds each range's maximum, a
+    short serial prefix over those gives the peak entering every range,
+    and the second scans each range from that peak. Returns exactly the
+    serial result.
+    """
+    n = equity.shape[0]
+    chunks = max(1, min(chunks, n))
+    range_peaks = np.empty(chunks)
+    for c in prange(chunks):
+        c_peak = equity[c * n // chunks]
+        for i in range(c * n // chunks, (c + 1) * n // chunks):
+            if equity[i] > c_peak:
+                c_peak = equity[i]
+        range_peaks[c] = c_peak
+
+    entry_peaks = np.empty(chunks)
+    running = equity[0]
+    for c in range(chunks):
+        entry_peaks[c] = running
+        running = max(running, range_peaks[c])
+
+    worst = np.zeros(chunks)
+    for c in prange(chunks):
+        peak = entry_peaks[c]
+        c_worst = 0.0
+        for i in range(c * n // chunks, (c + 1) * n // chunks):
+            value = equity[i]
+            if value > peak:
+                peak = value
+            else:
+                drawdown = (value - peak) / peak
+                if drawdown < c_worst:
+                    c_worst = drawdown
+        worst[c] = c_worst
+    return worst.min()
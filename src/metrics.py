@@ -1,11 +1,21 @@
 """Base and concrete implementations of performance metrics."""
 
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass
-from typing import List
+from typing import Dict, Iterator, List, Optional, Tuple
+import math
 import numpy as np
-from scipy.stats import gmean
-
+from numba import get_num_threads
+
+from src.metric_kernels import (
+    PARALLEL_MIN_LENGTH,
+    max_drawdown,
+    max_drawdown_parallel,
+    return_stats,
+    return_stats_parallel,
+)
 from src.types import Trade
 
 
@@ -18,6 +28,99 @@ class MetricResult:
     unit: str = ""
 
 
+# Per-curve return statistics, shared between metrics while a
+# shared_intermediates() block is active. Entries keep the curve itself
+# alongside its stats so the curve stays alive and its id cannot be reused
+_return_stats_memo: ContextVar[
+    Optional[Dict[int, Tuple[object, Tuple[float, float]]]]
+] = ContextVar("return_stats_memo", default=None)
+
+
+@contextmanager
+def shared_intermediates() -> Iterator[None]:
+    """Compute return statistics once per equity curve inside the block.
+
+    The annualized return, volatility and Sharpe metrics all start from the
+    same pass over the curve. Within the block that pass runs once per curve
+    object and its result is reused; curves must not be mutated while it is
+    active. The memo is local to the current thread or task, and a nested
+    block shares the enclosing block's memo.
+    """
+    if _return_stats_memo.get() is not None:
+        yield
+        return
+    token = _return_stats_memo.set({})
+    try:
+        yield
+    finally:
+        _return_stats_memo.reset(token)
+
+
+def _return_stats(equity_curve: List[float]) -> Tuple[float, float]:
+    """Return (geometric mean daily return, sample variance) of an equity curve."""
+    memo = _return_stats_memo.get()
+    if memo is None:
+        return _compute_return_stats(equity_curve)
+    entry = memo.get(id(equity_curve))
+    if entry is None or entry[0] is not equity_curve:
+        entry = memo[id(equity_curve)] = (
+            equity_curve,
+            _compute_return_stats(equity_curve),
+        )
+    return entry[1]
+
+
+def _compute_return_stats(equity_curve: List[float]) -> Tuple[float, float]:
+    equity = np.ascontiguousarray(equity_curve, dtype=np.float64)
+    if len(equity) >= PARALLEL_MIN_LENGTH:
+        count, mean_log, _, m2 = return_stats_parallel(equity, get_num_threads())
+    else:
+        count, mean_log, _, m2 = return_stats(equity)
+    gmean_day_return = math.expm1(mean_log)
+    # Use sample variance (ddof=1 for sample, ddof=0 for population)
+    # If only one return value, use population variance
+    variance = m2 / (count - 1) if count > 1 else 0.0
+    return gmean_day_return, variance
+
+
+def _trade_pnls(trades: List[Trade]) -> np.ndarray:
+    """Return the trades' PnL as an array.
+
+    Reads the ``pnl`` column directly when trades are kept in a ``TradeLog``
+    and only walks ``Trade`` objects for plain lists.
+    """
+    to_array = getattr(trades, "to_array", None)
+    if to_array is not None:
+        return to_array()["pnl"]
+    return np.fromiter((trade.pnl for trade in trades), np.float64, len(trades))
+
+
+#: Bars per year used to annualize per-bar returns (trading days for daily bars)
+PERIODS_PER_YEAR = 252
+
+
+def _annualized_return(gmean_day_return: float, periods: int) -> float:
+    """Annualize a geometric mean per-bar return (as a decimal)."""
+    return (1 + gmean_day_return) ** periods - 1
+
+
+def _annualize(
+    gmean_day_return: float, variance: float, periods: int
+) -> Tuple[float, float]:
+    """Return (annualized return, annualized volatility) as decimals.
+
+    The compounded growth ``(1 + g) ** periods`` is raised once and reused
+    for both; its square stands in for ``(1 + g) ** (2 * periods)``.
+    """
+    growth = (1 + gmean_day_return) ** periods
+    # Annualized volatility formula from backtesting.py; clamp rounding
+    # noise below zero when the variance is zero
+    volatility = np.sqrt(
+        max((variance + (1 + gmean_day_return) ** 2) ** periods - growth * growth, 0.0)
+    )
+    return growth - 1, volatility
+
+
 class Metric(ABC):
     """Base class for all metrics.
 
@@ -77,7 +180,7 @@ class TotalReturnMetric(Metric):
         initial_capital: float,
         timestamps: List = None,
     ) -> float:
-        if not equity_curve:
+        if len(equity_curve) == 0:
             return 0.0
         final_equity = equity_curve[-1]
         return ((final_equity - initial_capital) / initial_capital) * 100
@@ -90,6 +193,14 @@ class AnnualizedReturnMetric(Metric):
     See: https://dx.doi.org/10.2139/ssrn.3054517
     """
 
+    def __init__(self, periods_per_year: int = PERIODS_PER_YEAR):
+        """Initialize annualized return metric.
+
+        Args:
+            periods_per_year: Bars per year (252 for daily bars)
+        """
+        self.periods_per_year = periods_per_year
+
     @property
     def name(self) -> str:
         return "Annualized Return"
@@ -105,23 +216,11 @@ class AnnualizedReturnMetric(Metric):
         initial_capital: float,
         timestamps: List = None,
     ) -> float:
-        if not equity_curve or len(equity_curve) < 2:
-            return 0.0
-
-        # Calculate daily returns
-        equity_array = np.array(equity_curve, dtype=float)
-        daily_returns = np.diff(equity_array) / equity_array[:-1]
-
-        if len(daily_returns) == 0:
+        if len(equity_curve) < 2:
             return 0.0
 
-        # Calculate geometric mean of daily returns
-        gmean_day_return = gmean(1 + daily_returns) - 1
-
-        # Annualize (252 trading days per year)
-        annualized_return = (1 + gmean_day_return) ** 252 - 1
-
-        return float(annualized_return * 100)
+        gmean_day_return, _ = _return_stats(equity_curve)
+        return float(_annualized_return(gmean_day_return, self.periods_per_year) * 100)
 
 
 class AnnualizedVolatilityMetric(Metric):
@@ -132,6 +231,14 @@ class AnnualizedVolatilityMetric(Metric):
     See: https://dx.doi.org/10.2139/ssrn.3054517
     """
 
+    def __init__(self, periods_per_year: int = PERIODS_PER_YEAR):
+        """Initialize annualized volatility metric.
+
+        Args:
+            periods_per_year: Bars per year (252 for daily bars)
+        """
+        self.periods_per_year = periods_per_year
+
     @property
     def name(self) -> str:
         return "Annualized Volatility"
@@ -147,31 +254,12 @@ class AnnualizedVolatilityMetric(Metric):
         initial_capital: float,
         timestamps: List = None,
     ) -> float:
-        if not equity_curve or len(equity_curve) < 2:
+        if len(equity_curve) < 2:
             return 0.0
 
-        # Calculate daily returns
-        equity_array = np.array(equity_curve, dtype=float)
-        daily_returns = np.diff(equity_array) / equity_array[:-1]
-
-        if len(daily_returns) == 0:
-            return 0.0
-
-        # Calculate geometric mean of daily returns
-        gmean_day_return = gmean(1 + daily_returns) - 1
-
-        # Use sample variance (ddof=1 for sample, ddof=0 for population)
-        # If only one return value, use population variance
-        ddof = int(bool(len(daily_returns)))
-        variance = daily_returns.var(ddof=ddof)
-
-        # Annualized volatility formula from backtesting.py
-        annualized_volatility = np.sqrt(
-            (variance + (1 + gmean_day_return) ** 2) ** 252
-            - (1 + gmean_day_return) ** (2 * 252)
-        )
-
-        return float(annualized_volatility * 100)
+        gmean_day_return, variance = _return_stats(equity_curve)
+        _, volatility = _annualize(gmean_day_return, variance, self.periods_per_year)
+        return float(volatility * 100)
 
 
 class AnnualizedSharpeRatioMetric(Metric):
@@ -182,15 +270,17 @@ class AnnualizedSharpeRatioMetric(Metric):
     See: https://dx.doi.org/10.2139/ssrn.3054517
     """
 
-    def __init__(self, risk_free_rate: float = 0.0):
+    def __init__(
+        self, risk_free_rate: float = 0.0, periods_per_year: int = PERIODS_PER_YEAR
+    ):
         """Initialize Sharpe ratio metric.
 
         Args:
             risk_free_rate: Annual risk-free rate as decimal (e.g., 0.02 for 2%)
+            periods_per_year: Bars per year (252 for daily bars)
         """
         self.risk_free_rate = risk_free_rate
-        self._annualized_return_metric = AnnualizedReturnMetric()
-        self._volatility_metric = AnnualizedVolatilityMetric()
+        self.periods_per_year = periods_per_year
 
     @property
     def name(self) -> str:
@@ -207,26 +297,18 @@ class AnnualizedSharpeRatioMetric(Metric):
         initial_capital: float,
         timestamps: List = None,
     ) -> float:
-        if not equity_curve or len(equity_curve) < 2:
+        if len(equity_curve) < 2:
             return 0.0
 
-        # Get annualized return (in %)
-        annualized_return_pct = self._annualized_return_metric.calculate(
-            trades, equity_curve, initial_capital, timestamps
-        )
-
-        # Get annualized volatility (in %)
-        volatility_pct = self._volatility_metric.calculate(
-            trades, equity_curve, initial_capital, timestamps
+        # One pass over the curve feeds both annualizations
+        gmean_day_return, variance = _return_stats(equity_curve)
+        annualized_return, volatility = _annualize(
+            gmean_day_return, variance, self.periods_per_year
         )
 
-        if volatility_pct == 0 or np.isnan(volatility_pct):
+        if volatility == 0 or np.isnan(volatility):
             return 0.0
 
-        # Convert return and volatility from % to decimal for calculation
-        annualized_return = annualized_return_pct / 100
-        volatility = volatility_pct / 100
-
         # Sharpe ratio = (return - risk_free_rate) / volatility
         sharpe_ratio = (annualized_return - self.risk_free_rate) / volatility
 
@@ -251,15 +333,13 @@ class MaxDrawdownMetric(Metric):
         initial_capital: float,
         timestamps: List = None,
     ) -> float:
-        if not equity_curve:
+        if len(equity_curve) == 0:
             return 0.0
 
-        equity_array = np.array(equity_curve, dtype=float)
-        running_max = np.maximum.accumulate(equity_array)
-        drawdown = (equity_array - running_max) / running_max
-        max_drawdown = np.min(drawdown)
-
-        return float(max_drawdown * 100)
+        equity_array = np.ascontiguousarray(equity_curve, dtype=np.float64)
+        if len(equity_array) >= PARALLEL_MIN_LENGTH:
+            return float(max_drawdown_parallel(equity_array, get_num_threads()) * 100)
+        return float(max_drawdown(equity_array) * 100)
 
 
 class WinRateMetric(Metric):
@@ -283,8 +363,8 @@ class WinRateMetric(Metric):
         if not trades:
             return 0.0
 
-        winners = sum(1 for trade in trades if trade.pnl > 0)
-        return (winners / len(trades)) * 100
+        pnl = _trade_pnls(trades)
+        return float(np.count_nonzero(pnl > 0) / len(pnl) * 100)
 
 
 class AveragePnLPerTradeMetric(Metric):
@@ -308,8 +388,7 @@ class AveragePnLPerTradeMetric(Metric):
         if not trades:
             return 0.0
 
-        total_pnl = sum(trade.get("pnl", 0) for trade in trades)
-        return total_pnl / len(trades)
+        return float(_trade_pnls(trades).mean())
 
 
 class NumTradesMetric(Metric):
@@ -357,8 +436,9 @@ class ProfitFactorMetric(Metric):
         if not trades:
             return 0.0
 
-        gross_profit = sum(trade.pnl for trade in trades if trade.pnl > 0)
-        gross_loss = abs(sum(trade.pnl for trade in trades if trade.pnl < 0))
+        pnl = _trade_pnls(trades)
+        gross_profit = float(pnl[pnl > 0].sum())
+        gross_loss = float(-pnl[pnl < 0].sum())
 
         if gross_loss == 0:
             return float("inf") if gross_profit > 0 else 0.0
@@ -24,10 +24,13 @@ class NoOpStrategy(Strategy):
         Args:
             event: Market data event (bar/tick)
         """
-        price = event.close_price or event.trade_price
+        # Only the first event can place an order; return before touching
+        # the bar on every later one
+        if self.has_placed_initial_order:
+            return
 
-        # Place buy order on first event only
-        if not self.has_placed_initial_order and price is not None:
+        price = event.close
+        if price is not None:
             available_cash = self.context.portfolio.cash
             cash_to_use = available_cash * self.cash_percentage
 
@@ -44,11 +47,16 @@ class NoOpStrategy(Strategy):
                 self.create_order(order)
                 self.has_placed_initial_order = True
                 logger.info(
-                    f"Placing initial buy order: {quantity} shares of {event.symbol} @ ~${price:.2f}"
+                    "Placing initial buy order: {} shares of {} @ ~${:.2f}",
+                    quantity,
+                    event.symbol,
+                    price,
                 )
             else:
                 logger.info(
-                    f"Not enough cash to buy even 1 share (need ${price:.2f}, have ${available_cash:.2f})"
+                    "Not enough cash to buy even 1 share (need ${:.2f}, have ${:.2f})",
+                    price,
+                    available_cash,
                 )
 
     def on_fill(self, fill: Fill) -> None:
@@ -58,5 +66,9 @@ class NoOpStrategy(Strategy):
             fill: Fill event representing an executed order
         """
         logger.debug(
-            f"Received fill: {fill.side.value} {fill.quantity} {fill.symbol} @ ${fill.price:.2f}"
+            "Received fill: {} {} {} @ ${:.2f}",
+            fill.side.name,
+            fill.quantity,
+            fill.symbol,
+            fill.price,
         )
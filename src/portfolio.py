@@ -1,37 +1,164 @@
 """Portfolio and position management."""
 
+from collections.abc import Mapping
 from datetime import datetime
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
+import numpy as np
+
+from src.portfolio_kernels import mark_to_market, portfolio_fill, portfolio_fills
 from src.types import (
     Fill,
-    OrderSide,
-    Trade,
     Position,
     FillEvent,
     PriceUpdateEvent,
+    PriceUpdateBatchEvent,
     EquityUpdateEvent,
+    SymbolTable,
 )
 
+from src.broker import TradeLog
 from src.event_bus import EventBus
 
 
+class EquityCurve:
+    """Equity samples stored in preallocated NumPy buffers.
+
+    ``values`` is a contiguous float64 view that metrics can consume
+    directly. The buffers grow geometrically if more samples arrive than
+    were reserved. Indexing and iteration yield ``(timestamp, equity)``
+    tuples.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._equity = np.empty(capacity, dtype=np.float64)
+        self._timestamps = np.empty(capacity, dtype=object)
+        self._n = 0
+
+    def reserve(self, capacity: int) -> None:
+        """Make room for at least ``capacity`` samples without regrowing."""
+        if capacity > len(self._equity):
+            self._equity = np.resize(self._equity, capacity)
+            self._timestamps = np.resize(self._timestamps, capacity)
+
+    def append(self, timestamp: datetime, equity: float) -> None:
+        n = self._n
+        if n == len(self._equity):
+            self.reserve(2 * n or 1)
+        self._equity[n] = equity
+        self._timestamps[n] = timestamp
+        self._n = n + 1
+
+    def pop(self) -> Tuple[datetime, float]:
+        """Remove and return the last ``(timestamp, equity)`` sample."""
+        sample = self[-1]
+        self._n -= 1
+        return sample
+
+    @property
+    def values(self) -> np.ndarray:
+        """View of the recorded equity values."""
+        return self._equity[: self._n]
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """View of the timestamps matching ``values``."""
+        return self._timestamps[: self._n]
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __getitem__(self, i: int) -> Tuple[datetime, float]:
+        if i < 0:
+            i += self._n
+        if not 0 <= i < self._n:
+            raise IndexError("equity curve index out of range")
+        return self._timestamps[i], float(self._equity[i])
+
+    def __iter__(self) -> Iterator[Tuple[datetime, float]]:
+        return zip(self.timestamps, self.values.tolist())
+
+
+class PositionArrays(Mapping[str, Position]):
+    """Positions stored as parallel float64 arrays indexed by symbol id.
+
+    ``quantity``, ``avg_price`` and ``unrealized_pnl`` are views over the
+    interned symbols, so accounting and mark-to-market run over contiguous
+    columns. The ``Mapping`` interface yields ``Position`` snapshots for
+    callers that look positions up by symbol: each lookup builds a new
+    object from the arrays, and assigning to its fields does not change the
+    portfolio. Write through the array views (indexed by ``add(symbol)``)
+    instead.
+    """
+
+    __slots__ = ("symbols", "_quantity", "_avg_price", "_unrealized_pnl")
+
+    def __init__(self, capacity: int = 16):
+        self.symbols = SymbolTable()
+        self._quantity = np.zeros(capacity)
+        self._avg_price = np.zeros(capacity)
+        self._unrealized_pnl = np.zeros(capacity)
+
+    def add(self, symbol: str) -> int:
+        """Return the symbol's id, making room for it on first use."""
+        sym_id = self.symbols.get_or_add(symbol)
+        capacity = len(self._quantity)
+        if sym_id == capacity:
+            for name in ("_quantity", "_avg_price", "_unrealized_pnl"):
+                grown = np.zeros(2 * capacity)
+                grown[:capacity] = getattr(self, name)
+                setattr(self, name, grown)
+        return sym_id
+
+    @property
+    def quantity(self) -> np.ndarray:
+        return self._quantity[: len(self.symbols)]
+
+    @property
+    def avg_price(self) -> np.ndarray:
+        return self._avg_price[: len(self.symbols)]
+
+    @property
+    def unrealized_pnl(self) -> np.ndarray:
+        return self._unrealized_pnl[: len(self.symbols)]
+
+    def __getitem__(self, symbol: str) -> Position:
+        sym_id = self.symbols[symbol]
+        return Position(
+            symbol=symbol,
+            quantity=self._quantity.item(sym_id),
+            avg_price=self._avg_price.item(sym_id),
+            unrealized_pnl=self._unrealized_pnl.item(sym_id),
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.symbols)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+
 class Portfolio:
     """Tracks positions, PnL, and cash across all symbols."""
 
-    def __init__(self, initial_cash: float = 100000.0):
+    def __init__(self, initial_cash: float = 100000.0, n_bars: Optional[int] = None):
         """Initialize portfolio.
 
         Args:
-            event_bus: Event bus for publishing equity update events
             initial_cash: Starting cash balance
+            n_bars: Expected number of equity samples (one per bar), used to
+                    preallocate the equity curve when known
         """
         self.initial_cash = initial_cash
         self.cash = initial_cash
-        self.positions: Dict[str, Position] = {}
-        self.equity_curve: List[Tuple[datetime, float]] = []
-        self.trades: List[Trade] = []
+        self.positions = PositionArrays()
+        self.equity_curve = EquityCurve(n_bars or 1024)
+        # Closing trades, stored columnar; iterating yields Trade objects
+        self.trades = TradeLog(self.positions.symbols)
         self.event_bus = EventBus()
+        # Timestamp of the last published equity update; fill-driven updates
+        # at that same timestamp are coalesced into it
+        self._last_published: Optional[datetime] = None
 
     def on_fill(self, event: FillEvent) -> None:
         """Handle a FillEvent by applying the fill to the portfolio.
@@ -51,120 +178,181 @@ class Portfolio:
         Args:
             event: PriceUpdateEvent containing price and timestamp
         """
-        current_prices = {event.symbol: event.price}
-        self.update_unrealized_pnl(current_prices)
-        self.record_equity(event.timestamp)
-        # Publish equity update event
-        self.event_bus.publish(
-            EquityUpdateEvent(
-                equity=self.get_total_equity(),
-                timestamp=event.timestamp,
+        self.update_price(event.symbol, event.price, event.timestamp)
+
+    def on_price_update_batch(self, event: PriceUpdateBatchEvent) -> None:
+        """Handle a PriceUpdateBatchEvent with one mark-to-market pass.
+
+        This method is designed to be subscribed to the event bus.
+
+        Args:
+            event: PriceUpdateBatchEvent containing prices and timestamp
+        """
+        self.update_prices(event.prices, event.timestamp)
+
+    def step(
+        self, prices: Dict[str, float], fills: List[Fill], timestamp: datetime
+    ) -> float:
+        """Apply a bar's fills, mark positions to market and record equity.
+
+        Unrealized PnL and total equity are computed in the same walk over
+        the positions instead of one pass each, and a single equity update is
+        published for the bar rather than one per fill.
+
+        Args:
+            prices: Mapping of symbol to latest price
+            fills: Fills executed during this bar
+            timestamp: Time of the bar
+
+        Returns:
+            Total equity after the bar
+        """
+        if fills:
+            self._book_fills(fills)
+
+        market_value = self._mark(prices)
+        equity = self.cash + market_value
+        self.equity_curve.append(timestamp, equity)
+        self._publish_equity(timestamp, equity)
+        return equity
+
+    def update_prices(self, prices: Dict[str, float], timestamp: datetime) -> None:
+        """Update unrealized PnL for several symbols and record equity once.
+
+        Args:
+            prices: Mapping of symbol to latest price
+            timestamp: Time of the price update
+        """
+        # The mark-to-market pass yields the equity, so it is summed once
+        # and shared by the curve and the published event
+        equity = self.cash + self._mark(prices)
+        self.equity_curve.append(timestamp, equity)
+        self._publish_equity(timestamp, equity)
+
+    def update_price(self, symbol: str, price: float, timestamp: datetime) -> None:
+        """Update unrealized PnL for one symbol and record equity.
+
+        Same as on_price_update but takes plain values, so engines can call
+        it directly without building a PriceUpdateEvent.
+
+        Args:
+            symbol: Symbol whose price changed
+            price: Latest price
+            timestamp: Time of the price update
+        """
+        positions = self.positions
+        sym_id = positions.symbols.get(symbol)
+        if sym_id is not None:
+            # Only this symbol's unrealized PnL can change
+            quantity = positions._quantity[sym_id]
+            positions._unrealized_pnl[sym_id] = (
+                (price - positions._avg_price[sym_id]) * quantity if quantity else 0.0
             )
-        )
+        equity = self.get_total_equity()
+        self.equity_curve.append(timestamp, equity)
+        self._publish_equity(timestamp, equity)
 
     def apply_fill(self, fill: Fill) -> None:
         """Apply a fill to update positions and cash.
 
+        Equity is published at most once per timestamp for fills: the rest
+        of a burst of fills sharing a timestamp is reflected in the next
+        price-driven update instead of publishing one event each.
+
         Args:
             fill: Fill event to apply
         """
-        symbol = fill.symbol
-        if symbol not in self.positions:
-            self.positions[symbol] = Position(symbol=symbol)
-
-        position = self.positions[symbol]
-        cost = fill.quantity * fill.price + fill.commission
-        trade_pnl = 0.0
-
-        if fill.side == OrderSide.BUY:
-            if position.quantity < 0:
-                # Closing short position
-                close_quantity = min(abs(position.quantity), fill.quantity)
-                pnl = (
-                    position.avg_price - fill.price
-                ) * close_quantity - fill.commission
-                trade_pnl = pnl
-                position.quantity += close_quantity
-                self.cash += fill.quantity * fill.price - cost
-
-                self.trades.append(
-                    Trade(
-                        timestamp=fill.timestamp,
-                        symbol=fill.symbol,
-                        side=fill.side.value,
-                        quantity=close_quantity,
-                        price=fill.price,
-                        slippage=fill.slippage,
-                        commission=fill.commission,
-                        pnl=trade_pnl,
-                    )
-                )
+        self._book_fill(fill)
+        if fill.timestamp != self._last_published:
+            self._publish_equity(fill.timestamp)
 
-                if fill.quantity > close_quantity:
-                    # Opening long position with remainder
-                    remaining = fill.quantity - close_quantity
-                    total_cost = remaining * fill.price
-                    position.avg_price = fill.price
-                    position.quantity = remaining
-                    self.cash -= total_cost
-            else:
-                # Adding to long position
-                total_cost = position.avg_price * position.quantity + cost
-                position.quantity += fill.quantity
-                position.avg_price = (
-                    total_cost / position.quantity if position.quantity > 0 else 0
-                )
-                self.cash -= cost
-        else:  # SELL
-            if position.quantity > 0:
-                # Closing long position
-                close_quantity = min(position.quantity, fill.quantity)
-                pnl = (
-                    fill.price - position.avg_price
-                ) * close_quantity - fill.commission
-                trade_pnl = pnl
-                position.quantity -= close_quantity
-                self.cash += close_quantity * fill.price - fill.commission
-
-                self.trades.append(
-                    Trade(
-                        timestamp=fill.timestamp,
-                        symbol=fill.symbol,
-                        side=fill.side.value,
-                        quantity=close_quantity,
-                        price=fill.price,
-                        slippage=fill.slippage,
-                        commission=fill.commission,
-                        pnl=trade_pnl,
-                    )
-                )
+    def apply_fills(self, fills: List[Fill]) -> None:
+        """Apply a batch of fills and publish a single equity update.
 
-                if fill.quantity > close_quantity:
-                    # Opening short position with remainder
-                    remaining = fill.quantity - close_quantity
-                    position.avg_price = fill.price
-                    position.quantity = -remaining
-                    self.cash += remaining * fill.price - fill.commission
-            else:
-                # Adding to short position
-                total_proceeds = (
-                    abs(position.avg_price * position.quantity)
-                    + fill.quantity * fill.price
-                )
-                position.quantity -= fill.quantity
-                position.avg_price = (
-                    abs(total_proceeds / position.quantity)
-                    if position.quantity < 0
-                    else 0
-                )
-                self.cash += fill.quantity * fill.price - fill.commission
-        # Publish equity update event
-        self.event_bus.publish(
-            EquityUpdateEvent(
-                equity=self.get_total_equity(),
-                timestamp=fill.timestamp,
+        Args:
+            fills: Fills to apply, in execution order
+        """
+        if not fills:
+            return
+        self._book_fills(fills)
+        timestamp = fills[-1].timestamp
+        if timestamp != self._last_published:
+            self._publish_equity(timestamp)
+
+    def _book_fills(self, fills: List[Fill]) -> None:
+        """Book a non-empty batch of fills with one ``portfolio_fills`` call."""
+        add = self.positions.add
+        sym_ids = np.fromiter((add(fill.symbol) for fill in fills), np.intp, len(fills))
+        sides, qtys, prices, commissions = np.array(
+            [
+                (fill.side.value, fill.quantity, fill.price, fill.commission)
+                for fill in fills
+            ]
+        ).T
+        positions = self.positions
+        self.cash, closed, pnl = portfolio_fills(
+            positions._quantity,
+            positions._avg_price,
+            self.cash,
+            sym_ids,
+            sides,
+            qtys,
+            prices,
+            commissions,
+        )
+        append = self.trades.append
+        for i in np.flatnonzero(closed).tolist():
+            fill = fills[i]
+            append(
+                fill.timestamp,
+                int(sym_ids[i]),
+                fill.side.value,
+                closed[i],
+                fill.price,
+                fill.slippage,
+                fill.commission,
+                pnl[i],
             )
+
+    def _book_fill(self, fill: Fill) -> None:
+        """Update the position, cash and trade log for one fill."""
+        positions = self.positions
+        sym_id = positions.add(fill.symbol)
+        quantity, avg_price, self.cash, closed, pnl = portfolio_fill(
+            positions._quantity[sym_id],
+            positions._avg_price[sym_id],
+            self.cash,
+            fill.side.value,
+            fill.quantity,
+            fill.price,
+            fill.commission,
         )
+        positions._quantity[sym_id] = quantity
+        positions._avg_price[sym_id] = avg_price
+        if closed:
+            self.trades.append(
+                fill.timestamp,
+                sym_id,
+                fill.side.value,
+                closed,
+                fill.price,
+                fill.slippage,
+                fill.commission,
+                pnl,
+            )
+
+    def _publish_equity(
+        self, timestamp: datetime, equity: Optional[float] = None
+    ) -> None:
+        """Publish an equity update event, if anything is subscribed to it."""
+        self._last_published = timestamp
+        if self.event_bus.has_subscribers(EquityUpdateEvent):
+            self.event_bus.publish(
+                EquityUpdateEvent(
+                    equity=self.get_total_equity() if equity is None else equity,
+                    timestamp=timestamp,
+                )
+            )
 
     def update_unrealized_pnl(self, current_prices: Dict[str, float]) -> None:
         """Update unrealized PnL based on current market prices.
@@ -172,17 +360,20 @@ class Portfolio:
         Args:
             current_prices: Dictionary mapping symbols to current prices
         """
-        for symbol, position in self.positions.items():
-            if position.quantity != 0 and symbol in current_prices:
-                current_price = current_prices[symbol]
-                if position.quantity > 0:
-                    position.unrealized_pnl = (
-                        current_price - position.avg_price
-                    ) * position.quantity
-                else:
-                    position.unrealized_pnl = (
-                        position.avg_price - current_price
-                    ) * abs(position.quantity)
+        self._mark(current_prices)
+
+    def _mark(self, prices: Dict[str, float]) -> float:
+        """Mark positions to ``prices`` and return their market value."""
+        positions = self.positions
+        symbols = positions.symbols
+        marks = np.full(len(symbols), np.nan)
+        for symbol, price in prices.items():
+            sym_id = symbols.get(symbol)
+            if sym_id is not None:
+                marks[sym_id] = price
+        return mark_to_market(
+            positions.quantity, positions.avg_price, positions.unrealized_pnl, marks
+        )
 
     def get_total_equity(self) -> float:
         """Get total equity (cash + market value of all positions).
@@ -190,23 +381,22 @@ class Portfolio:
         Returns:
             Total equity value
         """
-        position_market_value = sum(
-            pos.quantity * pos.avg_price + pos.unrealized_pnl
-            for pos in self.positions.values()
+        positions = self.positions
+        return self.cash + float(
+            positions.quantity @ positions.avg_price + positions.unrealized_pnl.sum()
         )
-        return self.cash + position_market_value
 
     def record_equity(self, timestamp: datetime) -> None:
         """Record current equity to equity curve."""
-        self.equity_curve.append((timestamp, self.get_total_equity()))
+        self.equity_curve.append(timestamp, self.get_total_equity())
 
     def get_position(self, symbol: str) -> Position:
-        """Return existing position or create a new zero position for the symbol.
+        """Return a snapshot of the symbol's position, zero if it has none yet.
 
-        This prevents callers from needing to check for existence and aligns with
-        risk manager logic which expects a Position object even when none exists
-        yet for a given symbol.
+        Callers always get a Position without checking for existence first.
+        The result is a copy of the position at the time of the call: it does
+        not follow later fills, and changing its fields does not change the
+        portfolio.
         """
-        if symbol not in self.positions:
-            self.positions[symbol] = Position(symbol=symbol)
+        self.positions.add(symbol)
         return self.positions[symbol]
@@ -0,0 +1,111 @@
+"""Numba-compiled kernels for portfolio accounting.
+
+Sides use the integer codes from ``src.broker_kernels``.
+"""
+
+import math
+
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True)
+def portfolio_fill(
+    pos_qty: float,
+    pos_avg: float,
+    cash: float,
+    side: int,
+    qty: float,
+    fill_price: float,
+    commission: float,
+) -> tuple[float, float, float, float, float]:
+    """Apply a fill of ``qty`` (unsigned) to a position and the cash balance.
+
+    Buys and sells share one sign-parametric path: ``side`` (+1/-1) is the
+    direction of the position change. The part of the fill that reduces
+    the position realizes PnL; any remainder opens at the fill price. Cash
+    moves by the full traded notional plus one commission, and the
+    commission of a fill that adds to a position is folded into its entry
+    price (raising a long's basis, lowering a short's). A short's realized
+    PnL is therefore net of both its opening and closing commission, as a
+    long's is.
+
+    Returns:
+        Tuple of (new_quantity, new_avg_price, new_cash, closed_quantity,
+        realized_pnl) where the PnL is net of commission
+    """
+    closed = 0.0
+    pnl = 0.0
+    if pos_qty * side < 0:
+        closed = min(abs(pos_qty), qty)
+        pnl = side * (pos_avg - fill_price) * closed - commission
+    opened = qty - closed
+    new_qty = pos_qty + side * qty
+    if opened > 0:
+        if closed > 0:
+            # Flipped through flat: the remainder is a fresh position
+            pos_avg = fill_price
+        else:
+            pos_avg = (
+                pos_avg * abs(pos_qty) + fill_price * qty + side * commission
+            ) / abs(new_qty)
+    cash -= side * qty * fill_price + commission
+    return new_qty, pos_avg, cash, closed, pnl
+
+
+@njit(cache=True)
+def mark_to_market(
+    quantity: np.ndarray,
+    avg_price: np.ndarray,
+    unrealized_pnl: np.ndarray,
+    prices: np.ndarray,
+) -> float:
+    """Update ``unrealized_pnl`` in place and return the positions' market value.
+
+    Positions whose price is NaN keep their last unrealized PnL; flat
+    positions are reset to zero.
+    """
+    market_value = 0.0
+    for i in range(quantity.shape[0]):
+        qty = quantity[i]
+        if qty == 0:
+            unrealized_pnl[i] = 0.0
+        elif not math.isnan(prices[i]):
+            # Same as (avg - price) * |qty| for shorts
+            unrealized_pnl[i] = (prices[i] - avg_price[i]) * qty
+        market_value += qty * avg_price[i] + unrealized_pnl[i]
+    return market_value
+
+
+@njit(cache=True)
+def portfolio_fills(
+    quantity: np.ndarray,
+    avg_price: np.ndarray,
+    cash: float,
+    sym_ids: np.ndarray,
+    sides: np.ndarray,
+    qtys: np.ndarray,
+    prices: np.ndarray,
+    commissions: np.ndarray,
+) -> tuple[float, np.ndarray, np.ndarray]:
+    """Apply a batch of fills in order, updating the position arrays in place.
+
+    Returns:
+        Tuple of (new_cash, closed_quantity, realized_pnl) with one entry
+        per fill in the two arrays
+    """
+    n = sym_ids.shape[0]
+    closed = np.empty(n)
+    pnl = np.empty(n)
+    for i in range(n):
+        s = sym_ids[i]
+        quantity[s], avg_price[s], cash, closed[i], pnl[i] = portfolio_fill(
+            quantity[s],
+            avg_price[s],
+            cash,
+            sides[i],
+            qtys[i],
+            prices[i],
+            commissions[i],
+        )
+    return cash, closed, pnl
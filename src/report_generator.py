@@ -1,9 +1,11 @@
 """Report generator for orchestrating metric calculations."""
 
-from typing import List
+from dataclasses import replace
+from typing import List, Optional, Tuple
+import weakref
 
 from src.portfolio import Portfolio
-from src.metrics import Metric, MetricResult
+from src.metrics import PERIODS_PER_YEAR, Metric, MetricResult, shared_intermediates
 
 
 class ReportGenerator:
@@ -13,18 +15,28 @@ class ReportGenerator:
     from backtest results.
     """
 
-    def __init__(self, metrics: List[Metric] = None):
+    def __init__(
+        self, metrics: List[Metric] = None, periods_per_year: int = PERIODS_PER_YEAR
+    ):
         """Initialize report generator with metrics.
 
         Args:
             metrics: List of Metric instances to compute. If None, uses defaults.
+            periods_per_year: Bars per year the default annualized metrics
+                              use (252 for daily bars). Ignored when
+                              ``metrics`` is given
         """
-        self.metrics = metrics or self._default_metrics()
+        self.metrics = metrics or self._default_metrics(periods_per_year)
         self.metrics.sort(key=lambda m: m.name)
+        # (portfolio, key, results) of the last report, reused while the
+        # portfolio and the metrics have not changed; see _report_key
+        self._last_report: Optional[Tuple[weakref.ref, tuple, List[MetricResult]]] = (
+            None
+        )
 
     @staticmethod
-    def _default_metrics() -> List[Metric]:
-        """Return default set of metrics."""
+    def _default_metrics(periods_per_year: int = PERIODS_PER_YEAR) -> List[Metric]:
+        """Return default set of metrics annualized over ``periods_per_year``."""
         from src.metrics import (
             TotalReturnMetric,
             AnnualizedReturnMetric,
@@ -41,9 +53,9 @@ class ReportGenerator:
 
         return [
             TotalReturnMetric(),
-            AnnualizedReturnMetric(),
-            AnnualizedSharpeRatioMetric(),
-            AnnualizedVolatilityMetric(),
+            AnnualizedReturnMetric(periods_per_year),
+            AnnualizedSharpeRatioMetric(periods_per_year=periods_per_year),
+            AnnualizedVolatilityMetric(periods_per_year),
             MaxDrawdownMetric(),
             WinRateMetric(),
             NumTradesMetric(),
@@ -64,6 +76,7 @@ class ReportGenerator:
         """
         self.metrics.append(metric)
         self.metrics.sort(key=lambda m: m.name)
+        self._last_report = None
         return self
 
     def remove_metric(self, metric_name: str) -> "ReportGenerator":
@@ -77,37 +90,74 @@ class ReportGenerator:
         """
         self.metrics = [m for m in self.metrics if m.name != metric_name]
         self.metrics.sort(key=lambda m: m.name)
+        self._last_report = None
         return self
 
     def generate(self, portfolio: Portfolio) -> List[MetricResult]:
         """Generate report with detailed MetricResult objects.
 
+        Reports are memoized for the last portfolio: while its equity curve,
+        trade log and initial cash look unchanged (see ``_report_key``) and
+        the metrics and their settings are the same, calling again returns
+        copies of the previous results without recomputing any metric.
+
         Args:
-            trades: List of Trade objects from backtest
-            equity_curve: List of equity values over time
-            initial_capital: Starting capital
-            timestamps: List of timestamps for equity_curve (optional)
+            portfolio: Portfolio holding the equity curve and trades to report on
 
         Returns:
             List of MetricResult objects with name, value, and unit
         """
-        results = []
+        key = self._report_key(portfolio)
+        last = self._last_report
+        if last is not None and last[0]() is portfolio and last[1] == key:
+            return [replace(result) for result in last[2]]
 
-        for metric in self.metrics:
-            try:
-                timestamp, equity_curve = list(zip(*portfolio.equity_curve))
-                value = metric.calculate(
-                    portfolio.trades, equity_curve, portfolio.initial_cash, timestamp
-                )
-                results.append(
-                    MetricResult(name=metric.name, value=value, unit=metric.unit)
-                )
-            except Exception as e:
-                results.append(
-                    MetricResult(name=metric.name, value=None, unit=f"Error: {str(e)}")
-                )
-
-        return results
+        results = []
+        # Every metric sees the same inputs, so resolve them once; holding
+        # one curve object also lets metrics share intermediates computed
+        # from it
+        trades = portfolio.trades
+        equity = portfolio.equity_curve.values
+        initial_cash = portfolio.initial_cash
+        timestamps = portfolio.equity_curve.timestamps
+
+        with shared_intermediates():
+            for metric in self.metrics:
+                try:
+                    value = metric.calculate(trades, equity, initial_cash, timestamps)
+                    results.append(
+                        MetricResult(name=metric.name, value=value, unit=metric.unit)
+                    )
+                except Exception as e:
+                    results.append(
+                        MetricResult(
+                            name=metric.name, value=None, unit=f"Error: {str(e)}"
+                        )
+                    )
+
+        self._last_report = (weakref.ref(portfolio), key, results)
+        return [replace(result) for result in results]
+
+    def _report_key(self, portfolio: Portfolio) -> tuple:
+        """Return what a memoized report for ``portfolio`` depends on.
+
+        The equity curve and trade log only grow, except that the last
+        equity sample may be restated in place (as the finalize close-out
+        does), so their lengths plus the last equity value identify them.
+        Each metric is paired with a copy of its settings so adding,
+        removing or reconfiguring one invalidates the memo.
+        """
+        curve = portfolio.equity_curve
+        return (
+            len(curve),
+            curve.values[-1] if len(curve) else None,
+            len(portfolio.trades),
+            portfolio.initial_cash,
+            tuple(
+                (metric, dict(getattr(metric, "__dict__", {})))
+                for metric in self.metrics
+            ),
+        )
 
     def format_report(
         self,
@@ -9,6 +9,11 @@ from loguru import logger
 class Strategy(ABC):
     """Base class for trading strategies. Must be mode-agnostic (no if live/backtest)."""
 
+    #: Optional ``@njit`` array function ``(i, ohlc, positions, cash) -> orders``
+    #: used instead of the event callbacks by ``BacktestEngine(compiled=True)``.
+    #: See ``src.engine_kernels.run_backtest``.
+    signal_fn = None
+
     def __init__(self) -> None:
         super().__init__()
         self.pending_orders: List[Order] = []
@@ -65,8 +70,8 @@ class Strategy(ABC):
         """
         self.pending_orders.append(order)
         self._order_id_counter += 1
-        order_id = f"{self.__class__.__name__}_{self._order_id_counter}"
-        logger.debug(f"Order created: {order_id}")
+        order_id = self._order_id_counter
+        logger.debug("Order created: {}_{}", self.__class__.__name__, order_id)
         return order_id
 
     def get_orders(self) -> List[Order]:
@@ -1,10 +1,16 @@
 """Unit tests for broker order processing."""
 
+import tempfile
 import unittest
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest import mock
 
-from src.broker import BacktestSimulationBroker
-from src.types import Bar, OrderType
+import numpy as np
+import pyarrow.parquet as pq
+
+from src.broker import BacktestSimulationBroker, TradeLog
+from src.types import Bar, MultiBar, OrderType, SymbolTable
 
 
 def make_bar(
@@ -28,7 +34,7 @@ class TestBacktestSimulationBroker(unittest.TestCase):
         self.assertEqual(order.order_type, OrderType.MARKET)
 
         bar = make_bar("AAPL", open_price=100.0, high=105.0, low=95.0, close=102.0)
-        broker.process_orders({"AAPL": bar})
+        broker.process_orders(MultiBar.from_bars([bar]))
 
         self.assertEqual(len(broker.orders), 0)
         self.assertEqual(len(broker.trades), 1)
@@ -42,7 +48,7 @@ class TestBacktestSimulationBroker(unittest.TestCase):
         self.assertEqual(order.order_type, OrderType.LIMIT)
 
         bar = make_bar("AAPL", open_price=105.0, high=106.0, low=99.0, close=104.0)
-        broker.process_orders({"AAPL": bar})
+        broker.process_orders(MultiBar.from_bars([bar]))
 
         self.assertEqual(len(broker.orders), 0)
         self.assertEqual(len(broker.trades), 1)
@@ -56,7 +62,7 @@ class TestBacktestSimulationBroker(unittest.TestCase):
         self.assertEqual(order.order_type, OrderType.STOP)
 
         bar = make_bar("AAPL", open_price=100.0, high=101.0, low=95.0, close=97.0)
-        broker.process_orders({"AAPL": bar})
+        broker.process_orders(MultiBar.from_bars([bar]))
 
         self.assertEqual(len(broker.orders), 0)
         self.assertEqual(len(broker.trades), 1)
@@ -69,24 +75,34 @@ class TestBacktestSimulationBroker(unittest.TestCase):
         broker.new_order("AAPL", -5, limit=105.0, stop=None)
 
         bar = make_bar("AAPL", open_price=100.0, high=101.0, low=99.0, close=100.0)
-        broker.process_orders({"AAPL": bar})
+        broker.process_orders(MultiBar.from_bars([bar]))
 
         self.assertEqual(len(broker.orders), 1)
         self.assertEqual(len(broker.trades), 0)
 
+    def test_market_order_falls_back_to_close_without_open(self) -> None:
+        broker = BacktestSimulationBroker(initial_cash=100000.0)
+        broker.new_order("AAPL", 10, limit=None, stop=None)
+
+        bar = Bar(timestamp=datetime(2026, 1, 1), symbol="AAPL", close=101.0)
+        broker.process_orders(MultiBar.from_bars([bar]))
+
+        self.assertEqual(len(broker.trades), 1)
+        self.assertEqual(broker.trades[0].price, 101.0)
+
     def test_close_position_realizes_pnl(self) -> None:
         broker = BacktestSimulationBroker(initial_cash=100000.0)
         broker.new_order("AAPL", 10, limit=None, stop=None)
         first_bar = make_bar(
             "AAPL", open_price=100.0, high=101.0, low=99.0, close=100.0
         )
-        broker.process_orders({"AAPL": first_bar})
+        broker.process_orders(MultiBar.from_bars([first_bar]))
 
         broker.new_order("AAPL", -5, limit=None, stop=None)
         second_bar = make_bar(
             "AAPL", open_price=110.0, high=111.0, low=109.0, close=110.0
         )
-        broker.process_orders({"AAPL": second_bar})
+        broker.process_orders(MultiBar.from_bars([second_bar]))
 
         self.assertEqual(broker.positions["AAPL"].quantity, 5)
         self.assertEqual(broker.positions["AAPL"].avg_price, 100.0)
@@ -97,7 +113,7 @@ class TestBacktestSimulationBroker(unittest.TestCase):
         broker = BacktestSimulationBroker(initial_cash=100000.0, slippage=0.5)
         broker.new_order("AAPL", 10, limit=None, stop=None)
         bar = make_bar("AAPL", open_price=100.0, high=101.0, low=99.0, close=100.0)
-        broker.process_orders({"AAPL": bar})
+        broker.process_orders(MultiBar.from_bars([bar]))
 
         self.assertEqual(len(broker.trades), 1)
         self.assertEqual(broker.trades[0].price, 100.5)
@@ -105,7 +121,7 @@ class TestBacktestSimulationBroker(unittest.TestCase):
 
         broker.new_order("AAPL", -5, limit=None, stop=None)
         bar = make_bar("AAPL", open_price=100.0, high=101.0, low=99.0, close=100.0)
-        broker.process_orders({"AAPL": bar})
+        broker.process_orders(MultiBar.from_bars([bar]))
 
         self.assertEqual(len(broker.trades), 2)
         self.assertEqual(broker.trades[1].price, 99.5)
@@ -117,18 +133,135 @@ class TestBacktestSimulationBroker(unittest.TestCase):
         first_bar = make_bar(
             "AAPL", open_price=100.0, high=101.0, low=99.0, close=100.0
         )
-        broker.process_orders({"AAPL": first_bar})
+        broker.process_orders(MultiBar.from_bars([first_bar]))
 
         broker.new_order("AAPL", -10, limit=None, stop=None)
         second_bar = make_bar(
             "AAPL", open_price=110.0, high=111.0, low=109.0, close=110.0
         )
-        broker.process_orders({"AAPL": second_bar})
+        broker.process_orders(MultiBar.from_bars([second_bar]))
 
         self.assertEqual(len(broker.closed_trades), 2)
         self.assertEqual(broker.closed_trades[-1].pnl, 97.5)
         self.assertEqual(broker.closed_trades[-1].commission, 2.5)
 
+    def test_process_orders_fills_from_bar_columns(self) -> None:
+        broker = BacktestSimulationBroker(initial_cash=100000.0)
+        broker.new_order("MSFT", 3, limit=None, stop=None)
+        broker.new_order("AAPL", 10, limit=90.0, stop=None)
+
+        timestamp = datetime(2026, 1, 1)
+        broker.process_orders(
+            MultiBar(
+                SymbolTable(["AAPL", "MSFT"]),
+                np.array([timestamp, timestamp], dtype=object),
+                np.array([100.0, 200.0]),
+                np.array([105.0, 210.0]),
+                np.array([95.0, 190.0]),
+                np.array([102.0, 205.0]),
+                np.array([1000.0, 1000.0]),
+            )
+        )
+
+        self.assertEqual(len(broker.orders), 1)
+        self.assertEqual(broker.orders[0].symbol, "AAPL")
+        self.assertEqual(len(broker.trades), 1)
+        self.assertEqual(broker.trades[0].symbol, "MSFT")
+        self.assertEqual(broker.trades[0].price, 200.0)
+        self.assertEqual(broker.positions["MSFT"].quantity, 3)
+
+    def test_reused_symbol_index_picks_up_new_symbols(self) -> None:
+        broker = BacktestSimulationBroker(initial_cash=100000.0)
+        bar = MultiBar.from_bars(
+            [
+                make_bar("AAPL", open_price=100.0, high=101.0, low=99.0, close=100.0),
+                make_bar("MSFT", open_price=200.0, high=201.0, low=199.0, close=200.0),
+            ]
+        )
+        broker.new_order("AAPL", 1, limit=None, stop=None)
+        broker.process_orders(bar)
+
+        broker.new_order("MSFT", 2, limit=None, stop=None)
+        broker.process_orders(bar)
+
+        self.assertEqual(len(broker.orders), 0)
+        self.assertEqual(broker.trades[-1].symbol, "MSFT")
+        self.assertEqual(broker.trades[-1].price, 200.0)
+
+    def test_scalar_and_vectorized_paths_agree(self) -> None:
+        bar = MultiBar.from_bars(
+            [
+                make_bar("AAPL", open_price=100.0, high=105.0, low=95.0, close=102.0),
+                Bar(timestamp=datetime(2026, 1, 1), symbol="MSFT", close=201.0),
+            ]
+        )
+
+        def run(vectorize_min_orders: int) -> BacktestSimulationBroker:
+            broker = BacktestSimulationBroker(100000.0, slippage=0.5, commission=1.0)
+            broker.new_order("AAPL", 10, limit=None, stop=None)
+            broker.new_order("AAPL", -4, limit=104.0, stop=None)
+            broker.new_order("AAPL", 5, limit=90.0, stop=None)
+            broker.new_order("AAPL", -3, limit=None, stop=96.0)
+            broker.new_order("MSFT", 2, limit=None, stop=None)
+            broker.new_order("NVDA", 1, limit=None, stop=None)
+            with mock.patch("src.broker.VECTORIZE_MIN_ORDERS", vectorize_min_orders):
+                broker.process_orders(bar)
+            return broker
+
+        scalar, vectorized = run(100), run(0)
+
+        self.assertEqual(list(scalar.trades), list(vectorized.trades))
+        self.assertEqual(len(scalar.trades), 4)
+        self.assertEqual(
+            [order.symbol for order in scalar.orders],
+            [order.symbol for order in vectorized.orders],
+        )
+        self.assertEqual(dict(scalar.positions), dict(vectorized.positions))
+
+
+class TestTradeLog(unittest.TestCase):
+    def test_append_grows_capacity_and_round_trips_trades(self) -> None:
+        log = TradeLog(SymbolTable(["AAPL", "MSFT"]), capacity=1)
+        log.append(datetime(2026, 1, 1), 0, 1, 10.0, 100.0, 0.0, 1.0, 0.0)
+        log.append(datetime(2026, 1, 2), 1, -1, 5.0, 50.0, 0.5, 1.0, 12.5)
+
+        self.assertEqual(len(log), 2)
+        self.assertEqual(log[-1].symbol, "MSFT")
+        self.assertEqual(log[-1].side, "SELL")
+        self.assertEqual(log[-1].timestamp, datetime(2026, 1, 2))
+        self.assertEqual(log.to_array()["pnl"].tolist(), [0.0, 12.5])
+
+    def test_to_parquet_writes_columns(self) -> None:
+        log = TradeLog(SymbolTable(["AAPL", "MSFT"]))
+        log.append(datetime(2026, 1, 1), 0, 1, 10.0, 100.0, 0.0, 1.0, 0.0)
+        log.append(datetime(2026, 1, 2), 1, -1, 5.0, 50.0, 0.5, 1.0, 12.5)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "trades.parquet"
+            log.to_parquet(path)
+            table = pq.read_table(path)
+
+        self.assertEqual(table.column("symbol").to_pylist(), ["AAPL", "MSFT"])
+        self.assertEqual(table.column("side").to_pylist(), ["BUY", "SELL"])
+        self.assertEqual(table.column("pnl").to_pylist(), [0.0, 12.5])
+        self.assertEqual(
+            table.column("timestamp").to_pylist()[-1], datetime(2026, 1, 2)
+        )
+
+    def test_to_parquet_keeps_fixed_offset_timezone(self) -> None:
+        tz = timezone(timedelta(hours=5))
+        timestamp = datetime(2026, 1, 1, 9, 30, tzinfo=tz)
+        log = TradeLog(SymbolTable(["AAPL"]))
+        log.append(timestamp, 0, 1, 10.0, 100.0, 0.0, 1.0, 0.0)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "trades.parquet"
+            log.to_parquet(path)
+            table = pq.read_table(path)
+
+        self.assertEqual(table.schema.field("timestamp").type.tz, "+05:00")
+        self.assertEqual(table.column("timestamp").to_pylist(), [timestamp])
+
 
 if __name__ == "__main__":
     unittest.main()
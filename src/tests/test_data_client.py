@@ -0,0 +1,58 @@
+"""Unit tests for the Yahoo Finance data client's array layout."""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.data_client import YFinanceDataClient
+
+
+def make_frame(closes, volumes) -> pd.DataFrame:
+    closes = np.asarray(closes, dtype=np.float64)
+    return pd.DataFrame(
+        {
+            "Datetime": pd.date_range("2026-01-01", periods=len(closes)),
+            "Open": closes,
+            "High": closes,
+            "Low": closes,
+            "Close": closes,
+            "Volume": volumes,
+        }
+    )
+
+
+class TestBuildArrays(unittest.TestCase):
+    def setUp(self) -> None:
+        self.frame = make_frame([100.1, 101.2], [50_000_001, 7])
+
+    def test_prices_default_to_float32_and_volumes_stay_exact(self) -> None:
+        client = YFinanceDataClient(["AAPL"], period="5d", cache_dir=None)
+        client._build_arrays({"AAPL": self.frame})
+
+        self.assertEqual(client.ohlc.shape, (2, 1, 4))
+        self.assertEqual(client.ohlc.dtype, np.float32)
+        self.assertEqual(client.ohlc[0, 0, 3], np.float32(100.1))
+        self.assertEqual(client.volume.dtype, np.float64)
+        self.assertEqual(client.volume[:, 0].tolist(), [50_000_001, 7])
+
+    def test_float64_prices_are_exact(self) -> None:
+        client = YFinanceDataClient(
+            ["AAPL"], period="5d", cache_dir=None, price_dtype=np.float64
+        )
+        client._build_arrays({"AAPL": self.frame})
+
+        self.assertEqual(client.ohlc[0, 0, 3], 100.1)
+        self.assertEqual(client.volume[:, 0].tolist(), [50_000_001, 7])
+
+    def test_as_arrays_returns_volume_last(self) -> None:
+        client = YFinanceDataClient(["AAPL"], period="5d", cache_dir=None)
+        client._build_arrays({"AAPL": self.frame})
+
+        *_, close, volume = client.as_arrays()
+        self.assertEqual(close.dtype, np.float32)
+        self.assertIs(volume, client.volume)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,225 @@
+"""Integration tests for the backtest engine."""
+
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+from numba import njit
+
+from src.broker import BacktestSimulationBroker
+from src.data_client import DataClient
+from src.engine import BacktestEngine
+from src.portfolio import Portfolio
+from src.strategy import Strategy
+from src.types import MultiBar, Order, OrderSide, SymbolTable
+
+
+class StubDataClient(DataClient):
+    """Serves fixed bars given as an ``(n_bars, n_symbols, 5)`` OHLCV array."""
+
+    def __init__(self, symbols, ohlcv):
+        ohlcv = np.asarray(ohlcv, dtype=np.float64)
+        self.ohlc = ohlcv[:, :, :4]
+        self.volume = ohlcv[:, :, 4]
+        self.n_bars = len(ohlcv)
+        self.timestamps = np.array(
+            [datetime(2026, 1, 1) + timedelta(days=i) for i in range(len(ohlcv))],
+            dtype=object,
+        )
+        self._symbol_index = SymbolTable(symbols)
+
+    def as_arrays(self):
+        timestamps = np.broadcast_to(self.timestamps[:, None], self.volume.shape)
+        prices = np.moveaxis(self.ohlc, 2, 0)
+        return (self._symbol_index, timestamps, *prices, self.volume)
+
+    def stream(self):
+        symbol_index, *columns = self.as_arrays()
+        for ts, o, h, lo, c, v in zip(*columns):
+            yield MultiBar(symbol_index, ts, o, h, lo, c, v)
+
+
+def make_ohlcv(opens, closes):
+    """One-symbol bars with the given opens and closes (high/low span both)."""
+    opens = np.asarray(opens, dtype=np.float64)
+    closes = np.asarray(closes, dtype=np.float64)
+    ohlcv = np.zeros((len(opens), 1, 5))
+    ohlcv[:, 0, 0] = opens
+    ohlcv[:, 0, 1] = np.maximum(opens, closes)
+    ohlcv[:, 0, 2] = np.minimum(opens, closes)
+    ohlcv[:, 0, 3] = closes
+    ohlcv[:, 0, 4] = 1000.0
+    return ohlcv
+
+
+@njit
+def buy_once(i, ohlc, positions, cash):
+    orders = np.zeros(ohlc.shape[1])
+    if i == 0:
+        orders[0] = 10
+    return orders
+
+
+class BuyOnce(Strategy):
+    signal_fn = buy_once
+
+    def on_event(self, event) -> None:
+        pass
+
+    def on_fill(self, fill) -> None:
+        pass
+
+
+class Scripted(Strategy):
+    """Buys (positive) or sells (negative) a fixed quantity on given bars."""
+
+    def __init__(self, orders_by_bar):
+        super().__init__()
+        self.orders_by_bar = orders_by_bar
+        self.bar = -1
+        self.fills = []
+
+    def on_event(self, event) -> None:
+        self.bar += 1
+        quantity = self.orders_by_bar.get(self.bar)
+        if quantity:
+            side = OrderSide.BUY if quantity > 0 else OrderSide.SELL
+            self.create_order(Order(event.symbol, side, abs(quantity)))
+
+    def on_fill(self, fill) -> None:
+        self.fills.append(fill)
+
+
+def run_engine(strategy, ohlcv, finalize_trades=False, compiled=False):
+    portfolio = Portfolio(initial_cash=10000.0)
+    engine = BacktestEngine(
+        StubDataClient(["AAPL"], ohlcv),
+        BacktestSimulationBroker(10000.0, commission=1.0),
+        strategy,
+        portfolio,
+        logging_level="WARNING",
+        compiled=compiled,
+    )
+    engine.run(show_report=False, finalize_trades=finalize_trades)
+    return portfolio
+
+
+class TestBacktestLoop(unittest.TestCase):
+    def setUp(self) -> None:
+        self.ohlcv = make_ohlcv([100.0, 101.0, 110.0], [100.0, 105.0, 112.0])
+
+    def test_orders_fill_at_next_open_and_mark_to_close(self) -> None:
+        strategy = Scripted({0: 10, 1: -10})
+        portfolio = run_engine(strategy, self.ohlcv)
+
+        buy, sell = strategy.fills
+        self.assertEqual((buy.side, buy.quantity, buy.price), (OrderSide.BUY, 10, 101))
+        self.assertEqual(buy.timestamp, datetime(2026, 1, 2))
+        self.assertEqual(buy.commission, 1.0)
+        self.assertEqual((sell.side, sell.price), (OrderSide.SELL, 110))
+        self.assertEqual(sell.timestamp, datetime(2026, 1, 3))
+
+        self.assertEqual(portfolio.equity_curve.values.tolist(), [1e4, 10039, 10088])
+        self.assertEqual(portfolio.cash, 10088.0)
+        self.assertEqual(portfolio.positions["AAPL"].quantity, 0.0)
+        [trade] = portfolio.trades
+        self.assertAlmostEqual(trade.pnl, 88.0)
+
+    def test_open_positions_stay_open_without_finalize(self) -> None:
+        portfolio = run_engine(Scripted({0: 10}), self.ohlcv)
+
+        self.assertEqual(portfolio.positions["AAPL"].quantity, 10.0)
+        self.assertEqual(portfolio.equity_curve.values.tolist(), [1e4, 10039, 10109])
+        self.assertEqual(len(portfolio.trades), 0)
+
+    def test_equity_curve_is_reserved_for_all_bars(self) -> None:
+        portfolio = Portfolio(initial_cash=10000.0, n_bars=1)
+        engine = BacktestEngine(
+            StubDataClient(["AAPL"], self.ohlcv),
+            BacktestSimulationBroker(10000.0),
+            Scripted({}),
+            portfolio,
+            logging_level="WARNING",
+        )
+        engine.run(show_report=False)
+
+        # Reserved once for the three bars rather than doubled from one
+        self.assertEqual(len(portfolio.equity_curve), 3)
+        self.assertEqual(len(portfolio.equity_curve._equity), 3)
+
+    def test_matches_compiled_path(self) -> None:
+        python = run_engine(Scripted({0: 10}), self.ohlcv, True)
+        compiled = run_engine(BuyOnce(), self.ohlcv, True, compiled=True)
+
+        self.assertEqual(python.cash, compiled.cash)
+        self.assertEqual(
+            python.equity_curve.values.tolist(), compiled.equity_curve.values.tolist()
+        )
+        self.assertEqual(list(python.trades), list(compiled.trades))
+
+
+class TestCompiledBacktest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.ohlcv = make_ohlcv([100.0, 101.0, 110.0], [100.0, 105.0, 112.0])
+
+    def test_results_are_loaded_into_portfolio(self) -> None:
+        portfolio = run_engine(BuyOnce(), self.ohlcv, compiled=True)
+
+        # Bought 10 @ 101 (+1 commission) at bar 1's open
+        self.assertEqual(portfolio.cash, 8989.0)
+        self.assertEqual(portfolio.equity_curve.values.tolist(), [1e4, 10039, 10109])
+        self.assertEqual(portfolio.positions["AAPL"].quantity, 10.0)
+        self.assertAlmostEqual(portfolio.positions["AAPL"].avg_price, 101.1)
+        self.assertEqual(len(portfolio.trades), 0)
+
+    def test_total_equity_matches_python_path(self) -> None:
+        python = run_engine(Scripted({0: 10}), self.ohlcv)
+        compiled = run_engine(BuyOnce(), self.ohlcv, compiled=True)
+
+        self.assertAlmostEqual(compiled.get_total_equity(), 10109.0)
+        self.assertAlmostEqual(compiled.get_total_equity(), python.get_total_equity())
+        self.assertAlmostEqual(
+            compiled.positions["AAPL"].unrealized_pnl,
+            python.positions["AAPL"].unrealized_pnl,
+        )
+
+    def test_finalize_trades_closes_at_last_close(self) -> None:
+        portfolio = run_engine(
+            BuyOnce(), self.ohlcv, finalize_trades=True, compiled=True
+        )
+
+        self.assertEqual(portfolio.positions["AAPL"].quantity, 0.0)
+        self.assertEqual(portfolio.cash, 10108.0)
+        # The close-out restates the last sample instead of adding one
+        self.assertEqual(portfolio.equity_curve.values.tolist(), [1e4, 10039, 10108])
+        [trade] = portfolio.trades
+        self.assertEqual((trade.side, trade.quantity, trade.price), ("SELL", 10, 112))
+        self.assertAlmostEqual(trade.pnl, 108.0)
+
+
+class TestFinalizeTrades(unittest.TestCase):
+    def setUp(self) -> None:
+        self.ohlcv = make_ohlcv([100.0, 101.0, 110.0], [100.0, 105.0, 112.0])
+
+    def test_orders_pending_on_last_bar_are_cancelled(self) -> None:
+        portfolio = run_engine(Scripted({0: 10, 2: 10}), self.ohlcv, True)
+
+        self.assertEqual(portfolio.positions["AAPL"].quantity, 0.0)
+        self.assertEqual(portfolio.cash, 10108.0)
+        [trade] = portfolio.trades
+        self.assertEqual((trade.side, trade.quantity, trade.price), ("SELL", 10, 112))
+
+    def test_close_out_replaces_last_equity_sample(self) -> None:
+        portfolio = run_engine(Scripted({0: 10}), self.ohlcv, True)
+
+        self.assertEqual(portfolio.equity_curve.values.tolist(), [1e4, 10039, 10108])
+
+    def test_nothing_to_close_leaves_equity_curve(self) -> None:
+        portfolio = run_engine(Scripted({}), self.ohlcv, True)
+
+        self.assertEqual(portfolio.equity_curve.values.tolist(), [1e4, 1e4, 1e4])
+        self.assertEqual(len(portfolio.trades), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
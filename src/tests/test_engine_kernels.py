@@ -0,0 +1,68 @@
+"""Unit tests for the compiled backtest loop."""
+
+import unittest
+
+import numpy as np
+from numba import njit
+
+from src.engine_kernels import run_backtest
+
+
+@njit
+def buy_then_sell(i, ohlc, positions, cash):
+    orders = np.zeros(ohlc.shape[1])
+    if i == 0:
+        orders[0] = 10
+    elif i == 1:
+        orders[0] = -10
+    return orders
+
+
+@njit
+def short_then_cover(i, ohlc, positions, cash):
+    orders = np.zeros(ohlc.shape[1])
+    if i == 0:
+        orders[0] = -10
+    elif i == 1:
+        orders[0] = 10
+    return orders
+
+
+class TestRunBacktest(unittest.TestCase):
+    def test_orders_fill_at_next_open_and_mark_to_close(self) -> None:
+        ohlc = np.zeros((3, 1, 4))
+        ohlc[:, 0, 0] = [100.0, 101.0, 110.0]  # open
+        ohlc[:, 0, 3] = [100.0, 105.0, 112.0]  # close
+
+        equity, positions, avg_prices, cash, trades = run_backtest(
+            ohlc, 1000.0, 0.0, 1.0, buy_then_sell
+        )
+
+        # Bought 10 @ 101 (+1 commission) on bar 1, sold 10 @ 110 on bar 2
+        self.assertEqual(equity.tolist(), [1000.0, 1039.0, 1088.0])
+        self.assertEqual(positions.tolist(), [0.0])
+        self.assertEqual(cash, 1088.0)
+        self.assertEqual(len(trades), 1)
+        bar, symbol, side, quantity, price, slippage, commission, pnl = trades[0]
+        self.assertEqual((bar, quantity, price, commission), (2, 10.0, 110.0, 1.0))
+        self.assertEqual(side, -1)
+        self.assertAlmostEqual(pnl, 88.0)
+
+    def test_covering_a_short_pays_the_cover_price(self) -> None:
+        ohlc = np.zeros((3, 1, 4))
+        ohlc[:, 0, 0] = [100.0, 110.0, 100.0]  # open
+        ohlc[:, 0, 3] = [100.0, 105.0, 100.0]  # close
+
+        equity, positions, avg_prices, cash, trades = run_backtest(
+            ohlc, 1000.0, 0.0, 1.0, short_then_cover
+        )
+
+        # Shorted 10 @ 110 (-1 commission) on bar 1, covered 10 @ 100 on bar 2
+        self.assertEqual(positions.tolist(), [0.0])
+        self.assertEqual(cash, 1098.0)
+        self.assertEqual(equity.tolist(), [1000.0, 1049.0, 1098.0])
+        self.assertAlmostEqual(trades[0][7], 98.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+"""Unit tests for the domain event bus."""
+
+import unittest
+from datetime import datetime
+
+from src.event_bus import EventBus
+from src.types import EquityUpdateEvent, Fill, FillEvent, OrderSide
+
+TIMESTAMP = datetime(2026, 1, 1)
+
+
+def equity(value: float) -> EquityUpdateEvent:
+    return EquityUpdateEvent(equity=value, timestamp=TIMESTAMP)
+
+
+def fill_event() -> FillEvent:
+    fill = Fill(0, TIMESTAMP, "AAPL", OrderSide.BUY, 10.0, 100.0)
+    return FillEvent(fill=fill, timestamp=TIMESTAMP)
+
+
+class TestDispatch(unittest.TestCase):
+    def setUp(self) -> None:
+        self.bus = EventBus()
+        self.calls = []
+
+    def subscriber(self, name: str):
+        return lambda event: self.calls.append((name, event))
+
+    def test_single_subscriber_is_called_directly(self) -> None:
+        callback = self.subscriber("a")
+        self.bus.subscribe(EquityUpdateEvent, callback)
+        event = equity(1.0)
+
+        self.bus.publish(event)
+
+        self.assertIs(self.bus.dispatcher(EquityUpdateEvent), callback)
+        self.assertEqual(self.calls, [("a", event)])
+
+    def test_fan_out_calls_subscribers_in_order(self) -> None:
+        self.bus.subscribe(EquityUpdateEvent, self.subscriber("a"))
+        self.bus.subscribe(EquityUpdateEvent, self.subscriber("b"))
+        event = equity(1.0)
+
+        self.bus.publish(event)
+
+        self.assertEqual(self.calls, [("a", event), ("b", event)])
+
+    def test_dispatcher_reflects_subscriptions_at_call_time(self) -> None:
+        event = equity(1.0)
+        self.bus.dispatcher(EquityUpdateEvent)(event)
+        self.assertEqual(self.calls, [])
+
+        self.bus.subscribe(EquityUpdateEvent, self.subscriber("a"))
+        before = self.bus.dispatcher(EquityUpdateEvent)
+        self.bus.subscribe(EquityUpdateEvent, self.subscriber("b"))
+        after = self.bus.dispatcher(EquityUpdateEvent)
+
+        before(event)
+        self.assertEqual(self.calls, [("a", event)])
+        self.calls.clear()
+        after(event)
+        self.assertEqual(self.calls, [("a", event), ("b", event)])
+
+    def test_clear_subscribers_stops_delivery(self) -> None:
+        self.bus.subscribe(EquityUpdateEvent, self.subscriber("a"))
+        self.bus.clear_subscribers()
+
+        self.bus.publish(equity(1.0))
+        self.bus.dispatcher(EquityUpdateEvent)(equity(2.0))
+
+        self.assertEqual(self.calls, [])
+        self.assertFalse(self.bus.has_subscribers(EquityUpdateEvent))
+
+    def test_rejects_non_domain_types(self) -> None:
+        with self.assertRaises(TypeError):
+            self.bus.subscribe(int, self.subscriber("a"))
+        with self.assertRaises(TypeError):
+            self.bus.publish(object())
+
+
+class TestPublishMany(unittest.TestCase):
+    def setUp(self) -> None:
+        self.bus = EventBus()
+        self.calls = []
+        for name in ("a", "b"):
+            for event_type in (EquityUpdateEvent, FillEvent):
+                self.bus.subscribe(
+                    event_type,
+                    lambda event, name=name: self.calls.append((name, event)),
+                )
+
+    def test_matches_publishing_one_by_one(self) -> None:
+        events = [equity(1.0), fill_event(), equity(2.0), equity(3.0)]
+
+        for event in events:
+            self.bus.publish(event)
+        expected = self.calls
+        self.calls = []
+        self.bus.publish_many(events)
+
+        self.assertEqual(self.calls, expected)
+        self.assertEqual([event for name, event in self.calls if name == "a"], events)
+
+    def test_unsubscribed_events_are_ignored(self) -> None:
+        bus = EventBus()
+        bus.publish_many([equity(1.0), fill_event()])
+
+    def test_rejects_non_domain_events(self) -> None:
+        with self.assertRaises(TypeError):
+            EventBus().publish_many([equity(1.0), object()])
+
+
+if __name__ == "__main__":
+    unittest.main()
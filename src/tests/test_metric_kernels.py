@@ -0,0 +1,34 @@
+"""Unit tests for the equity-curve metric kernels."""
+
+import unittest
+
+import numpy as np
+
+from src.metric_kernels import (
+    max_drawdown,
+    max_drawdown_parallel,
+    return_stats,
+    return_stats_parallel,
+)
+
+
+class TestParallelKernels(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = np.random.default_rng(1)
+        self.equity = 100.0 * np.cumprod(1 + rng.normal(0.0, 0.01, 100_001))
+
+    def test_return_stats_match_serial_kernel(self) -> None:
+        count, mean_log, mean, m2 = return_stats_parallel(self.equity, 7)
+        expected = return_stats(self.equity)
+
+        self.assertEqual(count, expected[0])
+        np.testing.assert_allclose((mean_log, mean, m2), expected[1:], rtol=1e-9)
+
+    def test_max_drawdown_matches_serial_kernel(self) -> None:
+        self.assertEqual(
+            max_drawdown_parallel(self.equity, 7), max_drawdown(self.equity)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
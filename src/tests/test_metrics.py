@@ -0,0 +1,116 @@
+"""Unit tests for performance metrics."""
+
+import unittest
+from datetime import datetime
+from unittest import mock
+
+import numpy as np
+
+import src.metrics as metrics_module
+from src.broker import TradeLog
+from src.metrics import (
+    AnnualizedReturnMetric,
+    AnnualizedSharpeRatioMetric,
+    AnnualizedVolatilityMetric,
+    AveragePnLPerTradeMetric,
+    MaxDrawdownMetric,
+    ProfitFactorMetric,
+    WinRateMetric,
+    shared_intermediates,
+)
+from src.types import SymbolTable
+
+
+class TestAnnualizedMetrics(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = np.random.default_rng(0)
+        self.equity = 100000.0 * np.cumprod(1 + rng.normal(0.0005, 0.01, 500))
+        returns = np.diff(self.equity) / self.equity[:-1]
+        gmean_day_return = np.exp(np.log1p(returns).mean()) - 1
+        self.expected_return = (1 + gmean_day_return) ** 252 - 1
+        self.expected_volatility = np.sqrt(
+            (returns.var(ddof=1) + (1 + gmean_day_return) ** 2) ** 252
+            - (1 + gmean_day_return) ** (2 * 252)
+        )
+
+    def test_match_two_pass_numpy_formulas(self) -> None:
+        annualized_return = AnnualizedReturnMetric().calculate([], self.equity, 1e5)
+        volatility = AnnualizedVolatilityMetric().calculate([], self.equity, 1e5)
+        sharpe = AnnualizedSharpeRatioMetric().calculate([], self.equity, 1e5)
+
+        self.assertAlmostEqual(annualized_return, self.expected_return * 100)
+        self.assertAlmostEqual(volatility, self.expected_volatility * 100)
+        self.assertAlmostEqual(sharpe, self.expected_return / self.expected_volatility)
+
+    def test_periods_per_year_sets_compounding_horizon(self) -> None:
+        returns = np.diff(self.equity) / self.equity[:-1]
+        gmean_day_return = np.exp(np.log1p(returns).mean()) - 1
+        expected = ((1 + gmean_day_return) ** 12 - 1) * 100
+
+        metric = AnnualizedReturnMetric(periods_per_year=12)
+        self.assertAlmostEqual(metric.calculate([], self.equity, 1e5), expected)
+
+    def test_shared_intermediates_compute_return_stats_once(self) -> None:
+        metrics = (
+            AnnualizedReturnMetric(),
+            AnnualizedVolatilityMetric(),
+            AnnualizedSharpeRatioMetric(),
+        )
+        expected = [m.calculate([], self.equity, 1e5) for m in metrics]
+
+        with mock.patch(
+            "src.metrics.return_stats", wraps=metrics_module.return_stats
+        ) as kernel:
+            with shared_intermediates():
+                values = [m.calculate([], self.equity, 1e5) for m in metrics]
+
+        self.assertEqual(values, expected)
+        self.assertEqual(kernel.call_count, 1)
+
+    def test_nested_blocks_share_the_outer_memo(self) -> None:
+        metric = AnnualizedVolatilityMetric()
+        with mock.patch(
+            "src.metrics.return_stats", wraps=metrics_module.return_stats
+        ) as kernel:
+            with shared_intermediates():
+                with shared_intermediates():
+                    metric.calculate([], self.equity, 1e5)
+                metric.calculate([], self.equity, 1e5)
+
+        self.assertEqual(kernel.call_count, 1)
+
+    def test_temporary_curves_do_not_share_stats(self) -> None:
+        metric = AnnualizedReturnMetric()
+        with shared_intermediates():
+            values = [
+                metric.calculate([], np.array(curve), 1e5)
+                for curve in ([100.0, 110.0, 121.0], [100.0, 90.0, 81.0])
+            ]
+
+        self.assertGreater(values[0], 0)
+        self.assertLess(values[1], 0)
+
+    def test_short_curve_returns_zero(self) -> None:
+        self.assertEqual(AnnualizedSharpeRatioMetric().calculate([], [1.0], 1.0), 0.0)
+
+
+class TestMaxDrawdownMetric(unittest.TestCase):
+    def test_deepest_decline_from_running_peak(self) -> None:
+        equity = [100.0, 120.0, 90.0, 130.0, 104.0, 110.0]
+        self.assertAlmostEqual(MaxDrawdownMetric().calculate([], equity, 100.0), -25.0)
+
+
+class TestTradeMetrics(unittest.TestCase):
+    def test_trade_log_and_list_give_same_results(self) -> None:
+        log = TradeLog(SymbolTable(["AAPL"]))
+        for pnl in (30.0, -10.0, 20.0, -20.0):
+            log.append(datetime(2026, 1, 1), 0, -1, 1.0, 100.0, 0.0, 0.0, pnl)
+
+        for trades in (log, list(log)):
+            self.assertEqual(WinRateMetric().calculate(trades, [], 0.0), 50.0)
+            self.assertEqual(ProfitFactorMetric().calculate(trades, [], 0.0), 50 / 30)
+            self.assertEqual(AveragePnLPerTradeMetric().calculate(trades, [], 0.0), 5.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
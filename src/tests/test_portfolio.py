@@ -0,0 +1,121 @@
+"""Unit tests for portfolio fill accounting."""
+
+import unittest
+from datetime import datetime
+
+from src.portfolio import Portfolio
+from src.types import Fill, OrderSide
+
+TIMESTAMP = datetime(2026, 1, 1)
+
+
+def make_fill(
+    side: OrderSide, quantity: float, price: float, commission: float = 1.0
+) -> Fill:
+    return Fill(0, TIMESTAMP, "AAPL", side, quantity, price, commission=commission)
+
+
+class TestApplyFill(unittest.TestCase):
+    def setUp(self) -> None:
+        self.portfolio = Portfolio(initial_cash=10000.0)
+
+    def test_covering_a_short_pays_the_cover_price(self) -> None:
+        self.portfolio.apply_fill(make_fill(OrderSide.SELL, 10, 110.0))
+        self.assertEqual(self.portfolio.cash, 11099.0)
+        # Opening commission lowers the short's entry price
+        self.assertAlmostEqual(self.portfolio.positions["AAPL"].avg_price, 109.9)
+
+        equity = self.portfolio.step(
+            {"AAPL": 100.0}, [make_fill(OrderSide.BUY, 10, 100.0)], TIMESTAMP
+        )
+
+        self.assertEqual(self.portfolio.cash, 10098.0)
+        self.assertEqual(equity, 10098.0)
+        self.assertEqual(self.portfolio.positions["AAPL"].quantity, 0.0)
+        [trade] = self.portfolio.trades
+        self.assertEqual((trade.side, trade.quantity), ("BUY", 10))
+        self.assertAlmostEqual(trade.pnl, 98.0)
+
+    def test_flipping_long_to_short_charges_commission_once(self) -> None:
+        self.portfolio.apply_fill(make_fill(OrderSide.BUY, 10, 100.0))
+        self.portfolio.apply_fill(make_fill(OrderSide.SELL, 15, 110.0))
+
+        position = self.portfolio.positions["AAPL"]
+        self.assertEqual((position.quantity, position.avg_price), (-5.0, 110.0))
+        self.assertEqual(self.portfolio.cash, 10648.0)
+        # 10 shares gained 9.9 each over the 100.1 basis, minus the exit fee
+        [trade] = self.portfolio.trades
+        self.assertEqual(trade.quantity, 10)
+        self.assertAlmostEqual(trade.pnl, 98.0)
+        equity = self.portfolio.step({"AAPL": 110.0}, [], TIMESTAMP)
+        self.assertEqual(equity, 10098.0)
+
+    def test_adding_to_a_short_averages_the_entry(self) -> None:
+        self.portfolio.apply_fill(make_fill(OrderSide.SELL, 10, 100.0, commission=0))
+        self.portfolio.apply_fill(make_fill(OrderSide.SELL, 10, 110.0, commission=2))
+
+        position = self.portfolio.positions["AAPL"]
+        self.assertEqual(position.quantity, -20.0)
+        self.assertAlmostEqual(position.avg_price, 104.9)
+        self.assertEqual(self.portfolio.cash, 12098.0)
+        self.assertEqual(len(self.portfolio.trades), 0)
+
+    def test_batch_matches_one_by_one(self) -> None:
+        fills = [
+            make_fill(OrderSide.BUY, 10, 100.0),
+            make_fill(OrderSide.SELL, 15, 110.0),
+            make_fill(OrderSide.SELL, 5, 108.0),
+            make_fill(OrderSide.BUY, 10, 105.0),
+        ]
+        batched = Portfolio(initial_cash=10000.0)
+        batched.apply_fills(fills)
+        for fill in fills:
+            self.portfolio.apply_fill(fill)
+
+        self.assertEqual(batched.cash, self.portfolio.cash)
+        self.assertEqual(dict(batched.positions), dict(self.portfolio.positions))
+        self.assertEqual(list(batched.trades), list(self.portfolio.trades))
+
+
+class TestShortAccounting(unittest.TestCase):
+    """Pins the short-side numbers that changed with the sign-parametric fill.
+
+    Before it, a short's entry price left out the opening commission and
+    buying to cover debited only the commission, not the cover price.
+    """
+
+    def setUp(self) -> None:
+        self.portfolio = Portfolio(initial_cash=10000.0)
+        self.portfolio.apply_fill(make_fill(OrderSide.SELL, 10, 110.0, commission=5))
+
+    def test_short_entry_price_is_net_of_commission(self) -> None:
+        # (110 * 10 - 5) / 10, previously 110
+        self.assertAlmostEqual(self.portfolio.positions["AAPL"].avg_price, 109.5)
+        self.assertEqual(self.portfolio.cash, 11095.0)
+
+    def test_cover_debits_the_cover_price(self) -> None:
+        self.portfolio.apply_fill(make_fill(OrderSide.BUY, 4, 100.0, commission=5))
+
+        # 11095 - 4 * 100 - 5, previously 11095 - 5
+        self.assertEqual(self.portfolio.cash, 10690.0)
+        self.assertEqual(self.portfolio.positions["AAPL"].quantity, -6.0)
+        [trade] = self.portfolio.trades
+        # (109.5 - 100) * 4 - 5, previously (110 - 100) * 4 - 5
+        self.assertAlmostEqual(trade.pnl, 33.0)
+
+
+class TestPositionSnapshots(unittest.TestCase):
+    def test_get_position_returns_a_detached_copy(self) -> None:
+        portfolio = Portfolio(initial_cash=10000.0)
+        position = portfolio.get_position("AAPL")
+        self.assertEqual(position.quantity, 0.0)
+
+        position.quantity = 5.0
+        portfolio.apply_fill(make_fill(OrderSide.BUY, 10, 100.0))
+
+        self.assertEqual(position.quantity, 5.0)
+        self.assertEqual(portfolio.get_position("AAPL").quantity, 10.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
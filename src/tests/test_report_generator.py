@@ -0,0 +1,91 @@
+"""Unit tests for the report generator."""
+
+import unittest
+from datetime import datetime, timedelta
+
+from src.metrics import AnnualizedReturnMetric, TotalEquityMetric
+from src.portfolio import Portfolio
+from src.report_generator import ReportGenerator
+
+
+class CountingTotalEquity(TotalEquityMetric):
+    """TotalEquityMetric that counts how often it is calculated.
+
+    The count lives on the class so it is not part of the metric's settings.
+    """
+
+    calls = 0
+
+    def calculate(self, *args):
+        type(self).calls += 1
+        return super().calculate(*args)
+
+
+class TestReportMemoization(unittest.TestCase):
+    def setUp(self) -> None:
+        self.portfolio = Portfolio(initial_cash=100.0)
+        self.start = datetime(2026, 1, 1)
+        self.portfolio.record_equity(self.start)
+        CountingTotalEquity.calls = 0
+        self.generator = ReportGenerator([CountingTotalEquity()])
+
+    def test_unchanged_portfolio_reuses_results(self) -> None:
+        first = self.generator.generate(self.portfolio)
+        second = self.generator.generate(self.portfolio)
+
+        self.assertEqual(first, second)
+        self.assertEqual(CountingTotalEquity.calls, 1)
+
+    def test_cached_results_are_copies(self) -> None:
+        self.generator.generate(self.portfolio)[0].value = -1.0
+
+        [result] = self.generator.generate(self.portfolio)
+        self.assertEqual(result.value, 100.0)
+
+    def test_restated_last_sample_recomputes(self) -> None:
+        curve = self.portfolio.equity_curve
+        self.generator.generate(self.portfolio)
+        curve.pop()
+        curve.append(self.start, 50.0)
+
+        [result] = self.generator.generate(self.portfolio)
+        self.assertEqual(result.value, 50.0)
+
+    def test_changed_metric_settings_recompute(self) -> None:
+        self.portfolio.record_equity(self.start + timedelta(days=1))
+        self.portfolio.equity_curve.pop()
+        self.portfolio.equity_curve.append(self.start + timedelta(days=1), 110.0)
+        metric = AnnualizedReturnMetric(periods_per_year=1)
+        generator = ReportGenerator([metric])
+        [yearly] = generator.generate(self.portfolio)
+        metric.periods_per_year = 2
+
+        [twice_yearly] = generator.generate(self.portfolio)
+        self.assertAlmostEqual(yearly.value, 10.0)
+        self.assertAlmostEqual(twice_yearly.value, 21.0)
+
+    def test_new_equity_sample_recomputes(self) -> None:
+        self.generator.generate(self.portfolio)
+        self.portfolio.cash = 150.0
+        self.portfolio.record_equity(self.start + timedelta(days=1))
+
+        [result] = self.generator.generate(self.portfolio)
+        self.assertEqual(result.value, 150.0)
+
+
+class TestDefaultMetrics(unittest.TestCase):
+    def test_periods_per_year_reaches_the_annualized_metrics(self) -> None:
+        generator = ReportGenerator(periods_per_year=365 * 24)
+
+        annualized = [m for m in generator.metrics if hasattr(m, "periods_per_year")]
+        self.assertEqual(len(annualized), 3)
+        for metric in annualized:
+            self.assertEqual(metric.periods_per_year, 365 * 24)
+
+    def test_default_is_daily_bars(self) -> None:
+        for metric in ReportGenerator().metrics:
+            self.assertEqual(getattr(metric, "periods_per_year", 252), 252)
+
+
+if __name__ == "__main__":
+    unittest.main()
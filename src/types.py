@@ -2,10 +2,14 @@
 
 from __future__ import annotations
 
+import math
+from collections.abc import ItemsView, Iterable, Iterator, Mapping
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional, TYPE_CHECKING
-from enum import Enum
+from typing import Dict, Optional, Tuple, TYPE_CHECKING
+from enum import Enum, IntEnum
+
+import numpy as np
 
 if TYPE_CHECKING:
     from src.portfolio import Portfolio
@@ -13,11 +17,16 @@ if TYPE_CHECKING:
     from src.broker import Broker
 
 
-class OrderSide(Enum):
-    """Order side enumeration."""
+class OrderSide(IntEnum):
+    """Order side enumeration.
+
+    Values are the sign of the side's position change, so
+    ``side * quantity`` is the signed quantity. They match the side codes
+    used by the Numba kernels.
+    """
 
-    BUY = "BUY"
-    SELL = "SELL"
+    BUY = 1
+    SELL = -1
 
 
 class OrderType(Enum):
@@ -35,7 +44,7 @@ class EventType(Enum):
     BAR = "BAR"  # Aggregated OHLCV bar
 
 
-@dataclass
+@dataclass(slots=True)
 class Bar:
     timestamp: datetime
     symbol: str
@@ -53,10 +62,158 @@ class Bar:
         )
 
 
-MultiBar = dict[str, Bar]
+class SymbolTable(Mapping[str, int]):
+    """Interns symbols to dense integer ids (0, 1, 2, ...) in insertion order.
 
+    Ids index flat per-symbol storage (positions, price columns, trade rows)
+    so hot loops can use list/array indexing instead of string-keyed dicts.
+    """
 
-@dataclass
+    __slots__ = ("_ids", "_symbols")
+
+    def __init__(self, symbols: Iterable[str] = ()):
+        self._ids: Dict[str, int] = {}
+        self._symbols: list[str] = []
+        for symbol in symbols:
+            self.get_or_add(symbol)
+
+    def get_or_add(self, symbol: str) -> int:
+        """Return the id for ``symbol``, assigning the next id if it is new."""
+        sym_id = self._ids.get(symbol)
+        if sym_id is None:
+            sym_id = self._ids[symbol] = len(self._symbols)
+            self._symbols.append(symbol)
+        return sym_id
+
+    def symbol(self, sym_id: int) -> str:
+        """Return the symbol for an id."""
+        return self._symbols[sym_id]
+
+    def get(self, symbol: str, default: Optional[int] = None) -> Optional[int]:
+        return self._ids.get(symbol, default)
+
+    def items(self) -> ItemsView[str, int]:
+        return self._ids.items()
+
+    def __getitem__(self, symbol: str) -> int:
+        return self._ids[symbol]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._symbols)
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+
+def _nan_to_none(value: float) -> Optional[float]:
+    # NaN is the only float that is not equal to itself
+    return value if value == value else None
+
+
+class MultiBar(Mapping[str, Bar]):
+    """Bars for every symbol at one step, stored as parallel column arrays.
+
+    ``symbol_index`` maps a symbol to its position in the ``open``/``high``/
+    ``low``/``close``/``volume`` float arrays (missing values are NaN), so
+    hot loops can read prices without going through per-symbol ``Bar``
+    objects. Mapping access still returns a ``Bar`` for strategy code.
+    """
+
+    __slots__ = (
+        "symbol_index",
+        "timestamps",
+        "open",
+        "high",
+        "low",
+        "close",
+        "volume",
+        "_bars",
+    )
+
+    def __init__(
+        self,
+        symbol_index: Mapping[str, int],
+        timestamps: np.ndarray,
+        open: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        volume: np.ndarray,
+    ):
+        self.symbol_index = symbol_index
+        self.timestamps = timestamps
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        # Bars built on first access, so repeated lookups in a step are free
+        self._bars: Optional[Dict[str, Bar]] = None
+
+    @classmethod
+    def from_bars(cls, bars: Iterable[Bar]) -> MultiBar:
+        """Build a MultiBar from individual bars (None values become NaN)."""
+        bars = list(bars)
+
+        def column(field: str) -> np.ndarray:
+            return np.array([getattr(bar, field) for bar in bars], dtype=np.float64)
+
+        return cls(
+            symbol_index=SymbolTable(bar.symbol for bar in bars),
+            timestamps=np.array([bar.timestamp for bar in bars], dtype=object),
+            open=column("open"),
+            high=column("high"),
+            low=column("low"),
+            close=column("close"),
+            volume=column("volume"),
+        )
+
+    def __getitem__(self, symbol: str) -> Bar:
+        bars = self._bars
+        if bars is None:
+            bars = self._bars = {}
+        else:
+            bar = bars.get(symbol)
+            if bar is not None:
+                return bar
+        idx = self.symbol_index[symbol]
+        bar = bars[symbol] = Bar(
+            timestamp=self.timestamps[idx],
+            symbol=symbol,
+            # .item() returns a Python float without a NumPy scalar in between
+            volume=_nan_to_none(self.volume.item(idx)),
+            open=_nan_to_none(self.open.item(idx)),
+            high=_nan_to_none(self.high.item(idx)),
+            low=_nan_to_none(self.low.item(idx)),
+            close=_nan_to_none(self.close.item(idx)),
+        )
+        return bar
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.symbol_index)
+
+    def __len__(self) -> int:
+        return len(self.symbol_index)
+
+    @property
+    def timestamp(self) -> datetime:
+        """Timestamp of this step (symbols are aligned on one index)."""
+        return self.timestamps[0]
+
+    def closes(self) -> Iterator[Tuple[str, float]]:
+        """Yield ``(symbol, close)`` for every symbol with a close price.
+
+        Reads the close column directly, so marking positions to market does
+        not materialize a ``Bar`` per symbol.
+        """
+        close = self.close.tolist()
+        for symbol, idx in self.symbol_index.items():
+            price = close[idx]
+            if not math.isnan(price):
+                yield symbol, price
+
+
+@dataclass(slots=True)
 class Order:
     """Order representation."""
 
@@ -66,13 +223,15 @@ class Order:
     order_type: OrderType = OrderType.MARKET
     limit_price: Optional[float] = None
     stop_price: Optional[float] = None
+    # Interned symbol id assigned by the broker (-1 until assigned)
+    sym_id: int = -1
 
 
-@dataclass
+@dataclass(slots=True)
 class Fill:
     """Fill event representing an executed order."""
 
-    order_id: str
+    order_id: OrderId
     timestamp: datetime
     symbol: str
     side: OrderSide
@@ -82,8 +241,8 @@ class Fill:
     commission: float = 0.0
 
 
-# Type alias for Order ID
-OrderId = str
+# Type alias for Order ID (a per-strategy sequence number)
+OrderId = int
 
 
 @dataclass
@@ -96,7 +255,7 @@ class StrategyContext:
     config: dict = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Position:
     """Represents a position in a single symbol."""
 
@@ -106,7 +265,7 @@ class Position:
     unrealized_pnl: float = 0.0
 
 
-@dataclass
+@dataclass(slots=True)
 class Trade:
     """Represents a completed trade."""
 
@@ -125,14 +284,14 @@ class Trade:
 # ============================================================================
 
 
-@dataclass
+@dataclass(slots=True)
 class DomainEvent:
     """Base class for domain events."""
 
     pass
 
 
-@dataclass
+@dataclass(slots=True)
 class FillEvent(DomainEvent):
     """Event published when an order is filled.
 
@@ -147,7 +306,7 @@ class FillEvent(DomainEvent):
     timestamp: datetime
 
 
-@dataclass
+@dataclass(slots=True)
 class PriceUpdateEvent(DomainEvent):
     """Event published when a price update occurs (from market data).
 
@@ -161,7 +320,19 @@ class PriceUpdateEvent(DomainEvent):
     timestamp: datetime
 
 
-@dataclass
+@dataclass(slots=True)
+class PriceUpdateBatchEvent(DomainEvent):
+    """Event published once per step with the latest price of every symbol.
+
+    Subscribers should include:
+    - Portfolio (to update_unrealized_pnl and record_equity once per step)
+    """
+
+    prices: Dict[str, float]
+    timestamp: datetime
+
+
+@dataclass(slots=True)
 class EquityUpdateEvent(DomainEvent):
     """Event published when portfolio equity changes.
 